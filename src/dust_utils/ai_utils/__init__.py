@@ -1,7 +1,21 @@
-from .ai_chat import AIChat
-from .openrouter_credits import OpenRouterCredits
+import importlib
+
+# 按需加载：访问时才导入对应模块（PEP 562）
+_LAZY_ATTRS = {
+    "AIChat": ".ai_chat",
+    "OpenRouterCredits": ".openrouter_credits",
+}
 
 __all__ = [
     "AIChat",
     "OpenRouterCredits",
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,151 @@
 import requests
 import json
 import time
+import asyncio
 import re
 import hmac
 import hashlib
 import base64
 import urllib.parse
 import logging
-from .openrouter_credits import OpenRouterCredits
+import functools
+import concurrent.futures
+
+try:
+    import json_repair
+except ImportError:
+    json_repair = None  # 未安装时回退到AI修复
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # 未安装时使用标准库json
 
 # 创建模块专用记录器
 logger = logging.getLogger(__name__)
 
+# 常见编程语言列表，用于移除代码块标记
+_LANGUAGES = (
+    # 后端语言
+    "python",
+    "java",
+    "c",
+    "c++",
+    "c#",
+    "csharp",
+    "go",
+    "rust",
+    "php",
+    "ruby",
+    "kotlin",
+    "scala",
+    "perl",
+    "r",
+    # 前端语言
+    "javascript",
+    "typescript",
+    "html",
+    "css",
+    "sass",
+    "less",
+    "vue",
+    "react",
+    "angular",
+    # 数据库
+    "sql",
+    "mysql",
+    "postgresql",
+    "mongodb",
+    # 标记语言
+    "xml",
+    "yaml",
+    "json",
+    "markdown",
+    # 脚本语言
+    "shell",
+    "bash",
+    "powershell",
+    "batch",
+    # 移动开发
+    "swift",
+    "objective-c",
+    "dart",
+    "flutter",
+    # 其他语言
+    "matlab",
+    "assembly",
+    "fortran",
+    "cobol",
+    "pascal",
+    "ada",
+    "lisp",
+    "prolog",
+    "haskell",
+    "erlang",
+    "elixir",
+    "lua",
+)
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_lang_re(languages):
+    """将语言列表合并为一个交替正则，匹配 ```lang 形式的代码块起始标记"""
+    # 使用re.escape转义语言名，避免元字符引发正则错误
+    alternation = "|".join(re.escape(lang) for lang in languages)
+    return re.compile(rf"```(?:{alternation})[\s\n]", re.IGNORECASE)
+
+
+_LANG_RE = _compile_lang_re(_LANGUAGES)
+
+# fix_json 使用的正则
+# 仅在快速路径 json.loads 失败后执行，且均为C实现的线性扫描，
+# 不为此引入 numba/numpy 依赖
+_STYLE_RE = re.compile(r"<style>.*?</style>", re.DOTALL)
+# 匹配模式: "key":value 其中value不是以引号、数字、{、[、true、false、null开头的
+_UNQUOTED_VAL_RE = re.compile(r'("[^"]+":)\s*([^\s"\d\{\[trfn][^,\}\]]*)')
+_UNQUOTED_KEY_RE = re.compile(r"(\{|\,)\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*:")
+
+
+def _json_loads(json_str):
+    """解析JSON，优先使用orjson，解析失败均抛出json.JSONDecodeError"""
+    if orjson is not None:
+        try:
+            return orjson.loads(json_str)
+        except orjson.JSONDecodeError:
+            # orjson 不接受 NaN/Infinity 等标准库可解析的写法，交给标准库再试一次
+            pass
+    return json.loads(json_str)
+
+
+def _json_dumps(obj):
+    """
+    序列化为不转义中文的JSON字符串。
+    始终使用标准库，保持 json.dumps 默认的 ", "/": " 分隔符输出，且支持超过64位的整数
+    """
+    return json.dumps(obj, ensure_ascii=False)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_esprima():
+    """首次调用时导入 esprima"""
+    try:
+        import esprima
+    except ImportError:
+        raise ImportError("该功能需要 esprima，请执行：pip install esprima")
+    return esprima
+
+
+@functools.lru_cache(maxsize=None)
+def _get_mermaid():
+    """首次调用时导入 mermaid"""
+    try:
+        import mermaid
+    except ImportError:
+        raise ImportError(
+            "生成 Mermaid 图表需要 mermaid，请执行：pip install mermaid-py"
+        )
+    return mermaid
+
 
 class AIChat:
     """
@@ -24,7 +158,12 @@ class AIChat:
 
     主要方法:
     - send_message(): 发送消息并获取AI响应，支持文本和图像输入
+    - send_message_stream(): 流式发送消息，逐段返回AI响应
+    - send_messages_batch(): 异步并发发送多条相互独立的消息
+    - send_many(): 在单次completions请求中打包多条提示词
+    - submit_batch(): 通过Batch API提交离线批量任务（费用减半，24小时内完成）
     - clear_message(): 清空对话历史
+    - set_static_prefix(): 设置固定系统提示词前缀，便于命中提示词缓存
     - fix_json(): 修复不规范的JSON字符串
     - fix_code(): 移除代码块标记，支持多种编程语言
     - check_credits(): 查询账户余额
@@ -38,31 +177,29 @@ class AIChat:
         Args:
             config: 包含AI配置信息的字典，需要包含hostsUrl、apiKey和model字段
         """
-        try:
-            from openai import OpenAI
-
-            self.openai = OpenAI
-        except ImportError:
-            raise ImportError(
-                "检测到未安装 openai。请执行 'pip install openai' 以使用此功能。"
-            )
-
         self.base_url = config.get("baseUrl")
         self.api_key = config.get("apiKey")
         self.model = config.get("model")
         self.mask = config.get("mask")
         self.modelType = config.get("modelType")
+        # 对话历史最多保留的轮数，避免每次请求重发全部历史，None或0表示不限制
+        self.max_turns = config.get("maxTurns", 20)
+        # 固定的系统提示词前缀，保持请求前缀一致以命中服务商的提示词缓存
+        self.static_prefix = None
+        # 复用HTTP会话发送钉钉消息
+        self._http = requests.Session()
+        # 是否支持completions接口批量prompt，None表示尚未探测
+        self._completions_supported = None
 
         # 初始化ai角色定义
-        self.messageList = [
-            {
-                "role": "system",
-                "content": self.mask,
-            }
-        ]
+        self.messageList = [self._system_message()]
 
         # 金额定价
         self.input_price = config.get("inputPrice", 0) / 1000  # 输入金额定价
+        # 命中提示词缓存的输入金额定价，默认为输入定价的一半
+        self.cached_input_price = (
+            config.get("cachedInputPrice", config.get("inputPrice", 0) / 2) / 1000
+        )
         self.output_price = config.get("outputPrice", 0) / 1000  # 输出金额定价
         self.price = 0  # 已使用总金额
         self.useToken = 0  # 已使用总token
@@ -76,24 +213,42 @@ class AIChat:
         # 查询余额
         self.check_credits()
 
-    def send_message(self, message, image_url=None):
+    @functools.cached_property
+    def openai(self):
+        """OpenAI客户端类，首次使用时才导入 openai"""
+        try:
+            from openai import OpenAI
+        except ImportError:
+            raise ImportError(
+                "检测到未安装 openai。请执行 'pip install openai' 以使用此功能。"
+            )
+        return OpenAI
+
+    @functools.cached_property
+    def client(self):
+        """复用同一个客户端，保持HTTP连接池，避免每次请求重新握手"""
+        return self.openai(
+            # 若没有配置环境变量,请用阿里云百炼API Key将下行替换为:api_key="sk-xxx",
+            api_key=self.api_key,
+            base_url=self.base_url,
+        )
+
+    def send_message(self, message, image_url=None, stream=False):
         """
         发送消息到AI服务并获取响应
 
         Args:
             message: 要发送给AI的消息内容
+            stream: 是否使用流式请求，默认False
 
         Returns:
             str: AI的响应消息
         """
         try:
+            if stream:
+                return "".join(self.send_message_stream(message))
 
-            client = self.openai(
-                # 若没有配置环境变量,请用阿里云百炼API Key将下行替换为:api_key="sk-xxx",
-                api_key=self.api_key,
-                base_url=self.base_url,
-            )
-
+            client = self.client
             print("")
             logger.info(f"{message}", extra={"color": "#31bdec"})
             # 发送对话请求
@@ -117,26 +272,27 @@ class AIChat:
             response_content = assistant_output.choices[0].message.content
 
             # 计算本次对话的token使用量和金额
-            input_token = assistant_output.usage.prompt_tokens
-            output_token = assistant_output.usage.completion_tokens
+            input_token, output_token, cost = self._usage_cost(assistant_output.usage)
             self.useToken += input_token + output_token  # 累计使用token
-            self.price += (
-                input_token * self.input_price + output_token * self.output_price
-            )  # 累计使用金额
+            self.price += cost  # 累计使用金额
 
             # 将大模型的回复信息添加到对话列表中
             self.messageList.append({"role": "assistant", "content": response_content})
+            self._trim_history()
 
             logger.info(response_content + "")
             # 输出黄色的token使用量和本次对话金额
             logger.info(
-                f"使用Token: {input_token + output_token}\t金额: {(input_token * self.input_price + output_token * self.output_price):.6f}元\t响应时间: {response_time:.2f}秒\tAI模型: {self.model}\tbaseURL: {self.base_url}",
+                f"使用Token: {input_token + output_token}\t金额: {cost:.6f}元\t响应时间: {response_time:.2f}秒\tAI模型: {self.model}\tbaseURL: {self.base_url}",
                 extra={"color": "#ffb800"},
             )
 
             self.sendCount += 1  # 发送次数加1
             return response_content
 
+        except ImportError:
+            # 未安装 openai 时直接抛出，不当作请求失败
+            raise
         except requests.exceptions.RequestException as e:
             logger.error(f"请求发生错误: {e}")
             return None
@@ -147,16 +303,361 @@ class AIChat:
             logger.error(f"发生未知错误: {e}")
             return None
 
+    def send_message_stream(self, message):
+        """
+        以流式方式发送消息，边生成边返回内容片段
+
+        Args:
+            message: 要发送给AI的消息内容
+
+        Yields:
+            str: AI响应的内容片段
+        """
+        print("")
+        logger.info(f"{message}", extra={"color": "#31bdec"})
+        self.messageList.append({"role": "user", "content": message})
+
+        start_time = time.time()
+        response_stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=self.messageList,
+            stream=True,
+            # 最后一个分片返回token使用量
+            stream_options={"include_usage": True},
+            extra_body={"enable_thinking": False},
+        )
+
+        contents = []
+        usage = None
+        for chunk in response_stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                contents.append(content)
+                yield content
+
+        response_time = time.time() - start_time
+        self.useTime += response_time
+        response_content = "".join(contents)
+        self.messageList.append({"role": "assistant", "content": response_content})
+        self._trim_history()
+
+        input_token, output_token, cost = (
+            self._usage_cost(usage) if usage else (0, 0, 0)
+        )
+        self.useToken += input_token + output_token
+        self.price += cost
+
+        logger.info(response_content + "")
+        logger.info(
+            f"使用Token: {input_token + output_token}\t金额: {cost:.6f}元\t响应时间: {response_time:.2f}秒\tAI模型: {self.model}\tbaseURL: {self.base_url}",
+            extra={"color": "#ffb800"},
+        )
+
+        self.sendCount += 1
+
+    async def send_messages_batch(self, prompts, concurrency=8):
+        """
+        异步并发发送多条相互独立的消息，每条消息只携带当前对话历史，不写入历史
+
+        Args:
+            prompts: 要发送给AI的消息内容列表
+            concurrency: 最大并发请求数，受服务商RPM限制，默认8
+
+        Returns:
+            list: 与prompts顺序一致的AI响应列表，失败项为None
+        """
+        try:
+            from openai import AsyncOpenAI
+        except ImportError:
+            raise ImportError(
+                "检测到未安装 openai。请执行 'pip install openai' 以使用此功能。"
+            )
+
+        if not prompts:
+            return []
+
+        client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+        semaphore = asyncio.Semaphore(concurrency)
+        base_messages = list(self.messageList)
+
+        async def request(prompt):
+            async with semaphore:
+                start_time = time.time()
+                try:
+                    assistant_output = await client.chat.completions.create(
+                        model=self.model,
+                        messages=base_messages + [{"role": "user", "content": prompt}],
+                        extra_body={"enable_thinking": False},
+                    )
+                except Exception as e:
+                    logger.error(f"批量请求发生错误: {e}")
+                    return None, time.time() - start_time
+                return assistant_output, time.time() - start_time
+
+        try:
+            results = await asyncio.gather(*[request(p) for p in prompts])
+        finally:
+            await client.close()
+
+        # gather 返回后统一累计token、金额和时间，避免并发修改实例状态
+        responses = []
+        for assistant_output, response_time in results:
+            self.useTime += response_time
+            if assistant_output is None:
+                responses.append(None)
+                continue
+
+            input_token, output_token, cost = self._usage_cost(assistant_output.usage)
+            self.useToken += input_token + output_token
+            self.price += cost
+            self.sendCount += 1
+            responses.append(assistant_output.choices[0].message.content)
+
+        logger.info(
+            f"批量请求完成: {len(prompts)}条\t成功: {sum(r is not None for r in responses)}条\tAI模型: {self.model}",
+            extra={"color": "#ffb800"},
+        )
+        return responses
+
+    def send_many(self, prompts, max_tokens=1024):
+        """
+        在一次completions请求中打包发送多条相互独立的提示词
+
+        仅 modelType 为 "completion" 的模型走 completions 接口，
+        其他模型或调用失败时回退到 send_messages_batch 并发请求；
+        服务商明确不支持该接口时记住结果，后续调用直接走并发请求
+
+        Args:
+            prompts: 提示词列表
+            max_tokens: 每条提示词的最大生成token数，默认1024
+
+        Returns:
+            list: 与prompts顺序一致的AI响应列表
+        """
+        if not prompts:
+            return []
+
+        if self.modelType == "completion" and self._completions_supported is not False:
+            try:
+                start_time = time.time()
+                resp = self.client.completions.create(
+                    model=self.model, prompt=prompts, max_tokens=max_tokens
+                )
+                self.useTime += time.time() - start_time
+                self._completions_supported = True
+
+                input_token, output_token, cost = self._usage_cost(resp.usage)
+                self.useToken += input_token + output_token
+                self.price += cost
+                self.sendCount += 1
+                return [c.text for c in sorted(resp.choices, key=lambda c: c.index)]
+            except Exception as e:
+                if self._endpoint_unsupported(e):
+                    # 记录不支持，后续调用直接走并发请求
+                    self._completions_supported = False
+                    logger.warning(f"服务商不支持completions接口，回退到并发请求: {e}")
+                else:
+                    # 其他错误可能只是临时故障，仅本次回退
+                    logger.warning(f"completions批量请求失败，本次回退到并发请求: {e}")
+
+        return self._run_batch(prompts)
+
+    @staticmethod
+    def _endpoint_unsupported(e):
+        """判断异常是否表示服务商不支持所请求的接口（404，或接口不认识的400）"""
+        try:
+            import openai
+        except ImportError:
+            return False
+        if isinstance(e, openai.NotFoundError):
+            return True
+        return isinstance(e, openai.BadRequestError) and e.status_code in (400, 404)
+
+    def _run_batch(self, prompts):
+        """
+        同步执行 send_messages_batch
+
+        当前线程已有运行中的事件循环时 asyncio.run 会报错，此时改在工作线程中运行；
+        异步代码中建议直接 await send_messages_batch
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.send_messages_batch(prompts))
+
+        logger.debug("检测到运行中的事件循环，改在工作线程中执行并发请求")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(
+                asyncio.run, self.send_messages_batch(prompts)
+            ).result()
+
+    def submit_batch(self, prompts, poll_interval=30, timeout=None):
+        """
+        通过OpenAI Batch API提交离线批量任务，适用于不要求实时响应的大量请求
+
+        服务商不支持 /v1/batches 时自动回退到 send_messages_batch 并发请求
+
+        Args:
+            prompts: 要发送给AI的消息内容列表
+            poll_interval: 轮询任务状态的间隔秒数，默认30
+            timeout: 等待任务完成的最长秒数，None表示一直等待
+
+        Returns:
+            list: 与prompts顺序一致的AI响应列表，失败项为None
+
+        Raises:
+            TimeoutError: 超过timeout任务仍未结束，异常信息中包含batch.id
+        """
+        if not prompts:
+            return []
+
+        # 构建JSONL请求文件，每行一个请求
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": f"req-{i}",
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.model,
+                        "messages": [
+                            *self.messageList,
+                            {"role": "user", "content": prompt},
+                        ],
+                    },
+                },
+                ensure_ascii=False,
+            )
+            for i, prompt in enumerate(prompts)
+        ]
+        jsonl = "\n".join(lines).encode("utf-8")
+
+        try:
+            input_file = self.client.files.create(
+                file=("batch_input.jsonl", jsonl), purpose="batch"
+            )
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+            )
+        except Exception as e:
+            logger.warning(f"服务商不支持Batch API，回退到并发请求: {e}")
+            return self._run_batch(prompts)
+
+        logger.info(f"批量任务已提交: {batch.id}，共{len(prompts)}条")
+        start_time = time.time()
+        deadline = None if timeout is None else start_time + timeout
+        failures = 0
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            if deadline is not None and time.time() >= deadline:
+                self.useTime += time.time() - start_time
+                raise TimeoutError(
+                    f"批量任务超时未完成: {batch.id}，状态: {batch.status}"
+                )
+            time.sleep(poll_interval)
+            try:
+                batch = self.client.batches.retrieve(batch.id)
+            except Exception as e:
+                # 网络抖动等临时错误只记录并继续轮询，连续失败过多才放弃
+                failures += 1
+                if failures >= 5:
+                    self.useTime += time.time() - start_time
+                    raise
+                logger.warning(
+                    f"查询批量任务状态失败（第{failures}次）: {batch.id}，{e}"
+                )
+                continue
+            failures = 0
+        self.useTime += time.time() - start_time
+
+        if batch.status != "completed" or not batch.output_file_id:
+            logger.error(f"批量任务未完成: {batch.id}，状态: {batch.status}")
+            return [None] * len(prompts)
+
+        # 按custom_id还原结果顺序
+        results = {}
+        output = self.client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            body = response["body"]
+            input_token = body["usage"]["prompt_tokens"]
+            output_token = body["usage"]["completion_tokens"]
+            self.useToken += input_token + output_token
+            # Batch API 费用为实时请求的一半
+            self.price += (
+                input_token * self.input_price + output_token * self.output_price
+            ) / 2
+            self.sendCount += 1
+            results[item["custom_id"]] = body["choices"][0]["message"]["content"]
+
+        logger.info(
+            f"批量任务完成: {batch.id}\t成功: {len(results)}/{len(prompts)}条",
+            extra={"color": "#ffb800"},
+        )
+        return [results.get(f"req-{i}") for i in range(len(prompts))]
+
     def clear_message(self):
         """
         清空消息列表
         """
-        self.messageList = [
-            {
-                "role": "system",
-                "content": self.mask,
-            }
-        ]
+        self.messageList = [self._system_message()]
+
+    def set_static_prefix(self, text):
+        """
+        设置固定的系统提示词前缀，放在系统消息最前面
+
+        多个实例或多次对话共用相同前缀时，服务商的提示词缓存可以命中该前缀
+        （OpenAI 要求前缀不少于1024个token），命中部分按缓存价格计费
+
+        Args:
+            text: 系统提示词前缀，传入None取消
+        """
+        self.static_prefix = text
+        self.messageList[0] = self._system_message()
+
+    def _system_message(self):
+        """构建系统消息，固定前缀在前，角色定义在后"""
+        if self.static_prefix:
+            content = f"{self.static_prefix}\n\n{self.mask or ''}"
+        else:
+            content = self.mask
+        return {"role": "system", "content": content}
+
+    def _trim_history(self):
+        """只保留系统消息和最近 max_turns 轮对话"""
+        if not self.max_turns:
+            return
+        limit = self.max_turns * 2
+        if len(self.messageList) - 1 > limit:
+            del self.messageList[1 : len(self.messageList) - limit]
+
+    def _usage_cost(self, usage):
+        """
+        计算一次请求的token使用量和金额，命中提示词缓存的输入token按缓存价格计费
+
+        Returns:
+            tuple: (输入token, 输出token, 金额)
+        """
+        input_token = usage.prompt_tokens
+        output_token = usage.completion_tokens
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_token = getattr(details, "cached_tokens", None) or 0
+        cost = (
+            (input_token - cached_token) * self.input_price
+            + cached_token * self.cached_input_price
+            + output_token * self.output_price
+        )
+        return input_token, output_token, cost
 
     def fix_json(self, json_str, out_obj=True):
         """
@@ -177,6 +678,16 @@ class AIChat:
             else:
                 return "{}"
 
+        # 快速路径：已经是合法JSON时直接返回，跳过正则修复
+        if json_str.lstrip()[:1] in ("{", "["):
+            try:
+                jsonObj = _json_loads(json_str)
+                if out_obj:
+                    return jsonObj
+                return _json_dumps(jsonObj)
+            except json.JSONDecodeError:
+                pass
+
         try_count = 0
         max_try_count = 3  # 最大重试次数
 
@@ -185,22 +696,29 @@ class AIChat:
             json_str = self.fix_code(json_str, ["json"]).replace("\n", "")
 
             # 移除所有 <style>...</style> 内容
-            json_str = re.sub(r"<style>.*?</style>", "", json_str, flags=re.DOTALL)
-            # 使用正则表达式查找缺少引号的键值对
-            # 匹配模式: "key":value 其中value不是以引号、数字、{、[、true、false、null开头的
-            pattern = r'("[^"]+":)\s*([^\s"\d\{\[trfn][^,\}\]]*)'  # 匹配没有引号的值
-            json_str = re.sub(pattern, r'\1"\2"', json_str)
-
+            json_str = _STYLE_RE.sub("", json_str)
+            # 修复缺少引号的值
+            json_str = _UNQUOTED_VAL_RE.sub(r'\1"\2"', json_str)
             # 修复没有使用双引号包裹的属性名
-            pattern_unquoted_key = r"(\{|\,)\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*:"
-            json_str = re.sub(pattern_unquoted_key, r'\1"\2":', json_str)
+            json_str = _UNQUOTED_KEY_RE.sub(r'\1"\2":', json_str)
 
             try:
-                jsonObj = json.loads(json_str)
+                jsonObj = _json_loads(json_str)
                 if out_obj:
                     return jsonObj
-                return json.dumps(jsonObj, ensure_ascii=False)
+                return _json_dumps(jsonObj)
             except json.JSONDecodeError:
+                # 优先使用json_repair本地修复，避免请求AI
+                if json_repair is not None:
+                    try:
+                        jsonObj = json_repair.loads(json_str)
+                    except Exception:
+                        jsonObj = None
+                    if isinstance(jsonObj, (dict, list)) and jsonObj:
+                        if out_obj:
+                            return jsonObj
+                        return _json_dumps(jsonObj)
+
                 try_count += 1
                 jsonErrorQuestion = f"```{json_str}```这是一个json格式错误的文本，请帮我修正，请注意属性应被双引号包裹，我只要修正后的json，不要输出其他内容，也不要增删属性，保持json数据结构不变，属性值中可能存在双引号，注意转义"
                 json_str = self.send_message(jsonErrorQuestion)
@@ -221,10 +739,7 @@ class AIChat:
         Returns:
             str: 修复后的JavaScript代码字符串
         """
-        try:
-            import esprima
-        except ImportError:
-            raise ImportError("该功能需要 esprima，请执行：pip install esprima")
+        esprima = _get_esprima()
 
         if not javascript_code:
             return ""
@@ -287,12 +802,7 @@ class AIChat:
         Returns:
             str: 修复后的Mermaid图表代码字符串
         """
-        try:
-            import mermaid as md
-        except ImportError:
-            raise ImportError(
-                "生成 Mermaid 图表需要 mermaid，请执行：pip install mermaid-py"
-            )
+        md = _get_mermaid()
 
         if not mermaid_code:
             return ""
@@ -334,97 +844,44 @@ class AIChat:
         Returns:
             str: 移除代码块标记后的代码字符串，保持代码内容不变
         """
-        # 定义常见编程语言列表
-        languages = [
-            # 后端语言
-            "python",
-            "java",
-            "c",
-            "c++",
-            "c#",
-            "csharp",
-            "go",
-            "rust",
-            "php",
-            "ruby",
-            "kotlin",
-            "scala",
-            "perl",
-            "r",
-            # 前端语言
-            "javascript",
-            "typescript",
-            "html",
-            "css",
-            "sass",
-            "less",
-            "vue",
-            "react",
-            "angular",
-            # 数据库
-            "sql",
-            "mysql",
-            "postgresql",
-            "mongodb",
-            # 标记语言
-            "xml",
-            "yaml",
-            "json",
-            "markdown",
-            # 脚本语言
-            "shell",
-            "bash",
-            "powershell",
-            "batch",
-            # 移动开发
-            "swift",
-            "objective-c",
-            "dart",
-            "flutter",
-            # 其他语言
-            "matlab",
-            "assembly",
-            "fortran",
-            "cobol",
-            "pascal",
-            "ada",
-            "lisp",
-            "prolog",
-            "haskell",
-            "erlang",
-            "elixir",
-            "lua",
-        ]
-
-        if additional_tags:
-            languages.extend(additional_tags)
-
         if not code:
             return ""
 
-        # 使用正则表达式移除所有语言的代码块标记
-        for lang in languages:
-            # 使用re.escape转义语言名，避免元字符引发正则错误
-            pattern = re.compile(rf"```{re.escape(lang)}[\s\n]", re.IGNORECASE)
-            code = pattern.sub("", code)
+        # 没有代码块标记时直接返回，跳过正则扫描
+        if "```" not in code:
+            return code
+
+        # 使用预编译的合并正则一次性移除所有语言的代码块标记
+        code = _LANG_RE.sub("", code)
+        if additional_tags:
+            code = _compile_lang_re(tuple(sorted(additional_tags))).sub("", code)
 
         # 移除剩余的代码块标记和换行符
         code = code.replace("```", "")
 
         return code
 
-    def check_credits(self):
+    def check_credits(self, force=False):
         """
-        检查当前账户余额
+        检查当前账户余额，余额查询结果按apiKey短时缓存
+
+        Args:
+            force: 是否跳过缓存强制查询
         """
         if self.creditAlert is None or self.creditAlert <= 0:
             return
 
         # OpenRouter平台余额查询
         if self.base_url and "openrouter" in self.base_url:
+            # 仅在需要查询余额时导入
+            from .openrouter_credits import OpenRouterCredits
+
             # 初始化OpenRouterCredits对象
             credits = OpenRouterCredits(self.api_key)
-            self.credits = credits.get_credits()
+            # 单例被多个apiKey共用，按当前apiKey查询，不修改单例的token
+            self.credits = credits.get_credits(self.api_key, force=force)
+            if self.credits is None:
+                return
             # 检查余额是否低于预警值
             if self.credits["balance"] < self.creditAlert:
                 # 发送钉钉预警消息
@@ -464,7 +921,7 @@ class AIChat:
 
             # 发送POST请求
             headers = {"Content-Type": "application/json"}
-            response = requests.post(
+            response = self._http.post(
                 webhook_url, headers=headers, data=json.dumps(message)
             )
 
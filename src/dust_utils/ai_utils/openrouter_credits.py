@@ -1,6 +1,16 @@
 import requests
-import json
-from datetime import datetime
+import time
+import asyncio
+import threading
+
+# 余额缓存有效期（秒），余额按分钟级变化，无需每次实例化都查询
+CREDITS_TTL = 60
+# 余额缓存：{token: (余额对象, 查询时间)}
+_credits_cache = {}
+# 每个token一把锁：同一token的并发查询只请求一次，不同token之间互不阻塞
+_token_locks = {}
+# 复用会话，保持连接池
+_session = requests.Session()
 
 
 class OpenRouterCredits:
@@ -8,42 +18,95 @@ class OpenRouterCredits:
     _instance = None
     # 初始化标记
     _initialized = False
+    # 保护单例创建和 _token_locks 的锁，不在持有期间发起网络请求
+    _lock = threading.Lock()
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
         return cls._instance
 
     def __init__(self, token):
         # 确保init只执行一次
         if not OpenRouterCredits._initialized:
-            self.token = token
-            self.send_msg_date = None  # 上次预警发送时间
-            self.credits = None  # 余额对象
-            OpenRouterCredits._initialized = True
+            with OpenRouterCredits._lock:
+                if OpenRouterCredits._initialized:
+                    return
+                self.token = token
+                self.credits = None  # 余额对象
+                OpenRouterCredits._initialized = True
 
             self.get_credits()
 
-    def get_credits(self):
-        # 检查是否需要重置发送日期
-        if (
-            self.send_msg_date is None
-            or self.send_msg_date != datetime.now().date()
-            or self.credits is None
-        ):
+    @staticmethod
+    def _get_cached(token):
+        """返回该token未过期的缓存余额，没有则返回None"""
+        cached = _credits_cache.get(token)
+        if cached and time.monotonic() - cached[1] < CREDITS_TTL:
+            return cached[0]
+        return None
+
+    @staticmethod
+    def _token_lock(token):
+        """返回该token专用的查询锁，不存在时创建"""
+        lock = _token_locks.get(token)
+        if lock is None:
+            with OpenRouterCredits._lock:
+                lock = _token_locks.setdefault(token, threading.Lock())
+        return lock
+
+    def get_credits(self, token=None, force=False):
+        """
+        查询账户余额，结果按token分别缓存 CREDITS_TTL 秒
+
+        :param token: 要查询的apiKey，默认使用初始化时的token；
+                      多个apiKey共用单例时应显式传入，避免互相覆盖
+        :param force: 是否跳过缓存强制查询
+        :return: 余额对象，查询失败返回None
+        """
+        token = token or self.token
+        # 双重检查：先无锁读取缓存，未命中再加锁查询，避免并发重复请求
+        if not force:
+            credits = self._get_cached(token)
+            if credits is not None:
+                return self._remember(token, credits)
+
+        with self._token_lock(token):
+            if not force:
+                credits = self._get_cached(token)
+                if credits is not None:
+                    return self._remember(token, credits)
+
             url = "https://openrouter.ai/api/v1/credits"
-            headers = {"Authorization": f"Bearer {self.token}"}
+            headers = {"Authorization": f"Bearer {token}"}
             # {"data":{"total_credits":5,"total_usage":3.9272644175}}
-            resp = requests.get(url, headers=headers)
-            if resp.status_code == 200:
-                self.credits = json.loads(resp.text)["data"]
-
-                balance = self.credits["total_credits"] - self.credits["total_usage"]
-                self.credits["balance"] = balance
-                self.send_msg_date = datetime.now().date()
-                return self.credits
+            resp = _session.get(url, headers=headers, timeout=(3, 10))
+            # 空响应直接按失败处理，避免JSON解析异常
+            if resp.status_code == 200 and resp.content:
+                credits = resp.json()["data"]
+
+                balance = credits["total_credits"] - credits["total_usage"]
+                credits["balance"] = balance
+                _credits_cache[token] = (credits, time.monotonic())
+                return self._remember(token, credits)
             else:
                 print("查询失败：", resp.status_code, resp.text)
                 return None
 
-        return self.credits
+    def _remember(self, token, credits):
+        """仅初始化时的token的查询结果记录到 self.credits，其他token不修改共享状态"""
+        if token == self.token:
+            self.credits = credits
+        return credits
+
+    async def get_credits_async(self, token=None, force=False):
+        """
+        异步查询账户余额，在线程中执行 get_credits，不阻塞事件循环
+
+        :param token: 要查询的apiKey，默认使用初始化时的token
+        :param force: 是否跳过缓存强制查询
+        :return: 余额对象，查询失败返回None
+        """
+        return await asyncio.to_thread(self.get_credits, token, force)
@@ -7,6 +7,7 @@ import logging  # 用于日志记录
 from urllib.parse import quote, urljoin, urlunparse
 import re
 import json
+from concurrent.futures import ThreadPoolExecutor
 from .api_utils import ApiUtils
 
 # 创建模块专用记录器
@@ -29,6 +30,8 @@ class AliyunOCR:
 
     def __init__(self):
         self.base_url = "https://gjbsb.market.alicloudapi.com"
+        # 复用会话，保持连接池，避免每次请求重新握手
+        self._session = requests.Session()
 
     def post_ocrservice_advanced(self, params, app_code):
         """
@@ -63,5 +66,25 @@ class AliyunOCR:
         }
 
         # 发送POST请求并返回JSON响应
-        response = requests.post(url, json=params, headers=headers, proxies=None)
+        response = self._session.post(url, json=params, headers=headers, proxies=None)
         return response.json()
+
+    def post_ocrservice_advanced_batch(self, params_list, app_code, concurrency=8):
+        """
+        并发调用阿里云OCR服务的高级接口，适用于批量识别图片
+
+        :param params_list: 请求参数列表，每项同 post_ocrservice_advanced 的 params
+        :param app_code: 阿里云应用代码
+        :param concurrency: 最大并发数，需结合购买的QPS设置，默认8
+        :return: 与params_list顺序一致的响应JSON数据列表，失败项为None
+        """
+
+        def request(params):
+            try:
+                return self.post_ocrservice_advanced(params, app_code)
+            except Exception as e:
+                logger.error(f"OCR识别失败: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(request, params_list))
@@ -1,13 +1,32 @@
 import base64
+import functools
 import os  # 用于文件和目录操作
 import requests  # 用于发送HTTP请求
 from urllib.parse import urlparse  # 用于URL解析
 from urllib.parse import quote, urlunparse
 import logging  # 用于日志记录
+from concurrent.futures import ThreadPoolExecutor
 
 # 创建模块专用记录器
 logger = logging.getLogger(__name__)
 
+# 模块级共享会话，未传入session时使用，复用连接池
+_SESSION = requests.Session()
+
+# 图片base64分块编码的块大小（3的倍数）
+_B64_BLOCK_SIZE = 3 * 1024 * 1024
+
+# 文本类响应的 Content-Type 关键字
+_TEXT_LIKE = ("html", "json", "text", "xml")
+# 文本类型响应中仍可认定为文件的后缀
+_FILE_EXTS = frozenset(
+    (".pdf", ".zip", ".rar", ".jpg", ".jpeg", ".png", ".gif", ".mp4")
+)
+# 文件头特征：PDF、JPEG、PNG、GIF、ZIP/Office
+_FILE_SIGNATURES = (b"%PDF", b"\xff\xd8\xff", b"\x89PNG", b"GIF8", b"PK")
+# 非文件的响应特征：JSON错误信息
+_NOT_FILE_SIGNATURES = (b"{",)
+
 
 class ApiUtils:
 
@@ -17,15 +36,15 @@ class ApiUtils:
         # 简单判断是否为图片链接
         if img_file.startswith("http"):
             return img_file
-        else:
-            with open(os.path.expanduser(img_file), "rb") as f:  # 以二进制读取本地图片
-                data = f.read()
-        try:
-            encodestr = str(base64.b64encode(data), "utf-8")
-        except TypeError:
-            encodestr = base64.b64encode(data)
 
-        return encodestr
+        # 分块编码，块大小为3的倍数保证中间块没有填充，避免同时持有原始数据和编码结果
+        encoded = bytearray()
+        with open(os.path.expanduser(img_file), "rb") as f:  # 以二进制读取本地图片
+            while block := f.read(_B64_BLOCK_SIZE):
+                encoded += base64.b64encode(block)
+
+        # base64 结果只包含 ASCII 字符
+        return encoded.decode("ascii")
 
     @staticmethod
     def combined_params(params, default_params):
@@ -49,6 +68,20 @@ class ApiUtils:
 
         return params
 
+    @staticmethod
+    def unwrap_json(resp):
+        """
+        解析接口响应的JSON，先检查空响应和服务端错误，避免解析失败抛异常
+
+        :param resp: requests 响应对象
+        :return: 空响应返回{}，5xx返回{"code": 状态码}，否则返回解析后的JSON
+        """
+        if not resp.content:
+            return {}
+        if resp.status_code >= 500:
+            return {"code": resp.status_code}
+        return resp.json()
+
     @staticmethod
     def get_filename_by_url(url, has_suffix=True):
         """
@@ -90,7 +123,9 @@ class ApiUtils:
         return f"{base}/{path}"
 
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def url_encode(url):
+        """只编码URL的path部分，同一URL会被反复编码，结果缓存"""
         parsed = urlparse(url)
         safe_path = quote(parsed.path)  # 只编码 path
         return urlunparse(
@@ -105,218 +140,218 @@ class ApiUtils:
         )
 
     @staticmethod
-    def download_file(download_base_urls, file_url, file_path, desc="文件"):
+    def download_file(
+        download_base_urls,
+        file_url,
+        file_path,
+        desc="文件",
+        session=None,
+        chunk_size=1024 * 1024,
+        head_trust=None,
+    ):
         """
         从多个服务器的指定URL下载文件并保存到本地。
 
         :param file_url: 相对文件路径（不含服务器地址）
         :param file_path: 本地保存文件的路径
         :param desc: 文件描述
+        :param session: 复用的requests.Session，默认使用模块级共享会话
+        :param chunk_size: 每次写入的块大小，默认1MB
+        :param head_trust: {服务器域名: HEAD结果是否可靠}，透传给 check_file_exists
         :return: 下载成功返回文件路径，失败返回空字符串
         """
+        session = session or _SESSION
         headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
-        proxies = {"http": None, "https": None}
-        timeout = 10
+
+        # 确保目录存在，只需在下载前创建一次
+        dir_path = os.path.dirname(file_path)
+        if not dir_path:
+            raise ValueError("filePath 无效，未指定目录路径")
 
         # 统一清理相对路径
         relative_url: str = file_url.strip("/")
+        if not download_base_urls:
+            return ""
+        os.makedirs(dir_path, exist_ok=True)
 
-        for i, server_url in enumerate(download_base_urls):
-            is_last_attempt = i == len(download_base_urls) - 1
+        full_urls = []
+        for server_url in download_base_urls:
             if relative_url.startswith(server_url):
-                full_url = relative_url
+                full_urls.append(relative_url)
             else:
-                full_url = ApiUtils.url_concat(server_url, relative_url)
-
-            encoded_url = full_url
+                full_urls.append(ApiUtils.url_concat(server_url, relative_url))
 
-            logger.info(f"尝试访问服务器: {encoded_url}")
-
-            try:
-                # 改用 GET 方式探测，避免 HEAD 被误判为 200
-                try:
-                    result, status_code = ApiUtils.check_file_exists(
-                        full_url=encoded_url
+        # 并发探测所有服务器，再按 download_base_urls 的优先级顺序依次取结果：
+        # 高优先级的探测一完成即可开始下载，下载失败时继续尝试后续确认存在的地址
+        executor = ThreadPoolExecutor(max_workers=len(full_urls))
+        try:
+            futures = []
+            for url in full_urls:
+                logger.info(f"尝试访问服务器: {url}")
+                futures.append(
+                    executor.submit(
+                        ApiUtils.check_file_exists,
+                        full_url=url,
+                        session=session,
+                        head_trust=head_trust,
                     )
-                    if not result:
-                        logger.error(
-                            f"文件不存在，HTTP状态码: {status_code} → {encoded_url}"
-                        )
-                        if not is_last_attempt:
-                            continue
-                    else:
-                        logger.success(f"文件存在于: {encoded_url}")
-                except requests.RequestException as e:
-                    logger.error(f"探测文件失败: {encoded_url}, 错误: {e}")
+                )
+            for i, (url, future) in enumerate(zip(full_urls, futures)):
+                is_last_attempt = i == len(full_urls) - 1
+                try:
+                    result, status_code = future.result()
+                except Exception as e:
+                    logger.error(f"探测文件失败: {url}, 错误: {e}")
+                    continue
+                if result:
+                    logger.success(f"文件存在于: {url}")
+                else:
+                    logger.error(f"文件不存在，HTTP状态码: {status_code} → {url}")
+                    # 与逐个探测时一致，最后一个服务器即使探测失败也尝试下载
                     if not is_last_attempt:
                         continue
-                    else:
-                        return ""
-
-                # 确保目录存在
-                dir_path = os.path.dirname(file_path)
-                if not dir_path:
-                    raise ValueError("filePath 无效，未指定目录路径")
-                os.makedirs(dir_path, exist_ok=True)
-
-                # 下载文件
-                with requests.get(
-                    encoded_url,
-                    stream=True,
-                    headers=headers,
-                    timeout=30,
-                    proxies=proxies,
-                ) as r:
-                    if r.status_code == 200:
-                        logger.info(f"开始下载 {desc}: {encoded_url}")
-                        with open(file_path, "wb") as f:
-                            for chunk in r.iter_content(chunk_size=8192):
-                                if chunk:
-                                    f.write(chunk)
-                        logger.success(f"{desc} 下载成功 → {file_path}")
-                        return file_path
-                    else:
-                        logger.error(f"{desc} 下载失败，HTTP状态码: {r.status_code}")
-                        if is_last_attempt:
-                            return ""
-
-                # 确保目录存在
-                dir_path = os.path.dirname(file_path)
-                if not dir_path:
-                    raise ValueError("filePath 无效，未指定目录路径")
-                os.makedirs(dir_path, exist_ok=True)
-
-                # 下载文件
-                with requests.get(
-                    encoded_url,
-                    stream=True,
-                    headers=headers,
-                    timeout=30,
-                    proxies=proxies,
-                ) as r:
-                    if r.status_code == 200:
-                        logger.info(f"开始下载 {desc}: {encoded_url}")
-                        with open(file_path, "wb") as f:
-                            for chunk in r.iter_content(chunk_size=8192):
-                                if chunk:
-                                    f.write(chunk)
-                        logger.success(f"{desc} 下载成功 → {file_path}")
+                try:
+                    # 下载文件，失败则尝试下一个地址
+                    if ApiUtils._download_once(
+                        session, url, file_path, headers, desc, chunk_size
+                    ):
                         return file_path
-                    else:
-                        logger.error(f"{desc} 下载失败，HTTP状态码: {r.status_code}")
-                        if is_last_attempt:
-                            return ""
-            except requests.RequestException as e:
-                logger.error(f"访问服务器失败: {encoded_url}, 错误: {e}")
-                if is_last_attempt:
-                    return ""
+                except requests.RequestException as e:
+                    logger.error(f"访问服务器失败: {url}, 错误: {e}")
+        finally:
+            # 已下载成功时不再等待剩余探测
+            executor.shutdown(wait=False, cancel_futures=True)
 
         return ""
 
     @staticmethod
-    def check_file_exists(full_url, debug=False):
+    def _download_once(session, url, file_path, headers, desc, chunk_size):
+        """
+        从单个URL流式下载文件，下载中断时删除不完整的文件
+
+        :return: 下载成功返回True，HTTP状态码非200返回False
+        """
+        with session.get(
+            url,
+            stream=True,
+            headers=headers,
+            timeout=30,
+            proxies={"http": None, "https": None},
+        ) as r:
+            if r.status_code != 200:
+                logger.error(f"{desc} 下载失败，HTTP状态码: {r.status_code}")
+                return False
+
+            logger.info(f"开始下载 {desc}: {url}")
+            # iter_content 会把 urllib3 的读取异常转换为 requests.RequestException，
+            # 保证下载中断时调用方能继续尝试下一个地址
+            try:
+                with open(file_path, "wb") as f:
+                    for chunk in r.iter_content(chunk_size):
+                        f.write(chunk)
+            except BaseException:
+                # 删除未下载完整的文件，避免残留损坏文件
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                raise
+            logger.success(f"{desc} 下载成功 → {file_path}")
+            return True
+
+    @staticmethod
+    def check_file_exists(full_url, debug=False, session=None, head_trust=None):
         """
         判断远程 URL 是否存在文件
         自动兼容 HEAD/GET，支持 PDF/ZIP/图片/Office 文件判断
+
+        :param session: 复用的requests.Session，默认使用模块级共享会话
+        :param head_trust: {服务器域名: HEAD结果是否可靠}，True 时只以 HEAD 结果为准，
+                           False 时跳过 HEAD 直接 GET，未列出的服务器先 HEAD 再 GET
         """
+        session = session or _SESSION
+        status = None
         try:
             headers = {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
                 "Accept": "*/*",
+                # 探测时要求原始内容，保证文件头判断读取的是未压缩字节
+                "Accept-Encoding": "identity",
             }
             encoded_url = full_url  # quote(full_url, safe=":/")
 
-            # 1️⃣ 先尝试 HEAD 请求快速判断
-            try:
-                head_resp = requests.head(
-                    encoded_url,
-                    headers=headers,
-                    timeout=10,
-                    allow_redirects=True,
-                    proxies={"http": None, "https": None},
-                )
-                status = head_resp.status_code
-                content_type = head_resp.headers.get("Content-Type", "").lower()
-                content_length = head_resp.headers.get("Content-Length")
-                content_length = (
-                    int(content_length)
-                    if content_length and content_length.isdigit()
-                    else 0
-                )
-                ext = os.path.splitext(head_resp.url.split("?")[0])[1].lower()
-                text_like = any(
-                    t in content_type for t in ["html", "json", "text", "xml"]
-                )
-
-                # 简单判断 HEAD 可以直接确认
-                if status in (200, 206):
-                    if content_length > 0 and (
-                        not text_like
-                        or ext
-                        in [
-                            ".pdf",
-                            ".zip",
-                            ".rar",
-                            ".jpg",
-                            ".jpeg",
-                            ".png",
-                            ".gif",
-                            ".mp4",
-                        ]
-                    ):
-                        if debug:
-                            logger.info(f"HEAD判断文件存在: {full_url}")
-                        return True, status
-            except requests.RequestException:
-                # HEAD 失败则继续 GET
-                pass
-
-            # 2️⃣ 使用 GET 请求读取前几个字节判断文件类型
-            get_resp = requests.get(
+            # 1️⃣ 先尝试 HEAD 请求快速判断，已知 HEAD 不可靠的服务器直接使用 GET
+            trust = (head_trust or {}).get(urlparse(full_url).netloc)
+            if trust is not False:
+                try:
+                    head_resp = session.head(
+                        encoded_url,
+                        headers=headers,
+                        timeout=10,
+                        allow_redirects=True,
+                        proxies={"http": None, "https": None},
+                    )
+                    status = head_resp.status_code
+                    content_type = head_resp.headers.get("Content-Type", "").lower()
+                    content_length = head_resp.headers.get("Content-Length")
+                    content_length = (
+                        int(content_length)
+                        if content_length and content_length.isdigit()
+                        else 0
+                    )
+                    # 简单判断 HEAD 可以直接确认：有内容且不是文本类型，
+                    # 或虽为文本类型但后缀是常见文件类型
+                    if status in (200, 206) and content_length > 0:
+                        if not any(t in content_type for t in _TEXT_LIKE) or (
+                            os.path.splitext(head_resp.url.split("?")[0])[1].lower()
+                            in _FILE_EXTS
+                        ):
+                            if debug:
+                                logger.info(f"HEAD判断文件存在: {full_url}")
+                            return True, status
+                    # HEAD 可靠的服务器直接以 HEAD 结果为准，省去 GET 请求
+                    if trust:
+                        if status in (200, 206) and content_length > 0:
+                            return True, status
+                        if status == 404:
+                            return False, status
+                except requests.RequestException:
+                    # HEAD 失败则继续 GET
+                    pass
+
+            # 2️⃣ 使用 GET 请求读取前几个字节判断文件类型，读取后立即归还连接
+            with session.get(
                 encoded_url,
                 headers=headers,
                 timeout=10,
                 allow_redirects=True,
                 stream=True,
                 proxies={"http": None, "https": None},
-            )
+            ) as get_resp:
+                status = get_resp.status_code
+                if status not in (200, 206):
+                    return False, status
 
-            if get_resp.status_code not in (200, 206):
-                return False, get_resp.status_code
-
-            # 尝试读取前 64 字节判断文件类型
-            preview = get_resp.raw.read(64, decode_content=True)
+                # 尝试读取前 64 字节判断文件类型
+                preview = get_resp.raw.read(64, decode_content=True)
 
             # 文件头判断
-            file_signatures = {
-                b"%PDF": "PDF",
-                b"\xff\xd8\xff": "JPEG",
-                b"\x89PNG": "PNG",
-                b"GIF8": "GIF",
-                b"PK": "ZIP/Office",
-            }
-            for sig in file_signatures:
-                if preview.startswith(sig):
-                    if debug:
-                        logger.info(f"GET文件头判断: {file_signatures[sig]}")
-                    return True, get_resp.status_code
-
-            not_file_signatures = [b"{"]
+            if preview.startswith(_FILE_SIGNATURES):
+                if debug:
+                    logger.info(f"GET文件头判断为文件: {preview[:4]!r}")
+                return True, status
 
-            for sig in not_file_signatures:
-                if preview.startswith(sig):
-                    if debug:
-                        logger.info(f"GET文件头判断: {file_signatures[sig]}")
-                    return False, get_resp.status_code
+            if preview.startswith(_NOT_FILE_SIGNATURES):
+                if debug:
+                    logger.info(f"GET文件头判断不是文件: {preview[:4]!r}")
+                return False, status
 
             # 如果有内容但不匹配文件头，也认为可能是文件
             if len(preview) > 0:
                 if debug:
                     logger.info("GET判断有内容，可能是其他类型文件")
-                return True, get_resp.status_code
+                return True, status
 
-            return False, get_resp.status_code
+            return False, status
 
         except Exception as e:
             logger.error(f"判断文件存在性时出错: {full_url}, 错误: {e}")
-            return False, get_resp.status_code
+            return False, status
@@ -1,15 +1,37 @@
 # 导入必要的模块
 import random  # 用于生成随机数
 import requests  # 用于发送HTTP请求
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os  # 用于文件和目录操作
 import logging  # 用于日志记录
 import re
 import json
+import asyncio
+import math
+from concurrent.futures import ThreadPoolExecutor
 from .api_utils import ApiUtils
 
 # 创建模块专用记录器
 logger = logging.getLogger(__name__)
 
+# 安装了 brotli 时额外声明支持 br 压缩，requests 才能解码
+try:
+    import brotli  # noqa: F401
+
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+# 各下载服务器 HEAD 请求结果是否可靠，未列出的服务器先 HEAD 再 GET
+_HEAD_TRUST = {
+    "rhlt.oss-cn-beijing.aliyuncs.com": True,
+    "renhelitai.com": False,
+}
+
+# 源码路径开头的上传目录前缀
+_CODE_PATH_RE = re.compile(r"^/*profile/upload")
+
 
 # 禁用所有代理设置，确保直接连接
 os.environ.pop("HTTP_PROXY", None)
@@ -32,6 +54,24 @@ class RHLTAPI:
             raise ValueError("请求api时，token不能为空")
         self.token_str = token_str  # 存储token
         self.headers = {"Authorization": token_str}  # 设置请求头
+        # 复用会话和连接池，避免每次请求重新建立TCP+TLS连接
+        # 授权头仍按请求传入，会话同时用于下载OSS文件，不能携带授权头
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[502, 503, 504],
+                raise_on_status=False,  # 重试耗尽后返回最后的响应，由调用方处理状态码
+            ),
+        )
+        self.session.mount("https://", adapter)
+        # 列表接口返回的JSON较大，显式声明接受压缩以减少传输量
+        self.session.headers.update(
+            {"Accept-Encoding": _ACCEPT_ENCODING, "Connection": "keep-alive"}
+        )
         self.base_url = "https://renhelitai.com/prod-api"  # API基础URL
         # 软著名称后缀映射关系，用于标识不同类型的软件
         self.sys_soft_file_type = {
@@ -45,6 +85,16 @@ class RHLTAPI:
             "https://rhlt.oss-cn-beijing.aliyuncs.com",
             "https://renhelitai.com/prod-api/profile/upload",
         ]
+        # 预先拼接各接口地址
+        self._urls = {
+            "ccDetailList": f"{self.base_url}/system/distributer/ccDetailList",
+            "importSignatureFile": f"{self.base_url}/system/distributer/importSignatureFile",
+            "handleAproval": f"{self.base_url}/system/distributer/handleAproval",
+            "work_make_list": f"{self.base_url}/work/make/list",
+            "getFinalData": f"{self.base_url}/work/make/getFinalData/",
+            "getCodeDataInfo": f"{self.base_url}/work/make/getCodeDataInfo/",
+            "importData": f"{self.base_url}/work/make/importData",
+        }
 
     def get_ccDetailList(self, params: dict = {}) -> dict:
         """
@@ -54,7 +104,7 @@ class RHLTAPI:
         :return: API响应的JSON数据，包含软著详情列表
         """
         # 构建API请求URL
-        url = f"{self.base_url}/system/distributer/ccDetailList"
+        url = self._urls["ccDetailList"]
 
         # 设置默认的分页参数
         default_params = {
@@ -66,8 +116,8 @@ class RHLTAPI:
         params = ApiUtils.combined_params(params=params, default_params=default_params)
 
         # 发送GET请求并返回JSON响应
-        response = requests.get(url, params=params, headers=self.headers)
-        return response.json()
+        response = self.session.get(url, params=params, headers=self.headers)
+        return ApiUtils.unwrap_json(response)
 
     def post_importSignatureFile(self, busDistributerId: str, filePath: str) -> dict:
         """
@@ -78,7 +128,7 @@ class RHLTAPI:
         :return: 上传结果的JSON响应数据
         """
         # 构建上传URL
-        url = f"{self.base_url}/system/distributer/importSignatureFile"
+        url = self._urls["importSignatureFile"]
         # 设置请求参数
         params = {
             "busDistributerId": busDistributerId,
@@ -90,9 +140,11 @@ class RHLTAPI:
             return {}
 
         # 打开文件并发送POST请求
-        files = {"file": open(filePath, "rb")}
-        response = requests.post(url, params=params, files=files, headers=self.headers)
-        return response.json()
+        with open(filePath, "rb") as f:
+            response = self.session.post(
+                url, params=params, files={"file": f}, headers=self.headers
+            )
+        return ApiUtils.unwrap_json(response)
 
     def post_handleAproval(self, busDistributerId: str, caseStatus: int) -> dict:
         """
@@ -103,15 +155,15 @@ class RHLTAPI:
         :return: 审批操作的响应结果
         """
         # 构建审批URL
-        url = f"{self.base_url}/system/distributer/handleAproval"
+        url = self._urls["handleAproval"]
         # 设置审批参数
         params = {
             "id": busDistributerId,
             "caseStatus": caseStatus,
         }
         # 发送审批请求
-        response = requests.post(url, json=params, headers=self.headers)
-        return response.json()
+        response = self.session.post(url, json=params, headers=self.headers)
+        return ApiUtils.unwrap_json(response)
 
     def get_work_make_list(self, params: dict = {}) -> dict:
         """
@@ -121,7 +173,7 @@ class RHLTAPI:
         :return: 包含制件列表的JSON响应
         """
         # 构建列表查询URL
-        url = f"{self.base_url}/work/make/list"
+        url = self._urls["work_make_list"]
 
         # 设置默认分页参数
         default_params = {
@@ -132,8 +184,49 @@ class RHLTAPI:
         params = ApiUtils.combined_params(params, default_params)
 
         # 发送查询请求
-        response = requests.get(url, params=params, headers=self.headers)
-        return response.json()
+        response = self.session.get(url, params=params, headers=self.headers)
+        return ApiUtils.unwrap_json(response)
+
+    def iter_ccDetailList(self, params: dict = None, page_size=50, workers=4):
+        """
+        并发分页获取软著详情列表，按页码顺序逐条返回记录。
+
+        :param params: 查询参数字典，分页参数由本方法控制
+        :param page_size: 每页记录数
+        :param workers: 并发请求的线程数
+        :return: 记录生成器
+        """
+        return self._iter_pages(self.get_ccDetailList, params, page_size, workers)
+
+    def iter_work_make_list(self, params: dict = None, page_size=50, workers=4):
+        """
+        并发分页获取制件任务列表，按页码顺序逐条返回记录。
+
+        :param params: 查询参数，分页参数由本方法控制
+        :param page_size: 每页记录数
+        :param workers: 并发请求的线程数
+        :return: 记录生成器
+        """
+        return self._iter_pages(self.get_work_make_list, params, page_size, workers)
+
+    def _iter_pages(self, fetch, params, page_size, workers):
+        """
+        先请求第一页读取总数，其余页放入线程池并发请求，共用会话连接池
+        """
+        params = dict(params or {}, pageSize=page_size)
+        first = fetch(dict(params, pageNum=1))
+        yield from first.get("rows") or []
+
+        pages = math.ceil((first.get("total") or 0) / page_size)
+        if pages <= 1:
+            return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # map 按提交顺序返回结果，保证记录顺序与页码一致
+            results = executor.map(
+                lambda page: fetch(dict(params, pageNum=page)), range(2, pages + 1)
+            )
+            for result in results:
+                yield from result.get("rows") or []
 
     def download_case(self, case_id, output_dir):
         """
@@ -144,16 +237,25 @@ class RHLTAPI:
         :return: 保存的文件路径，下载失败返回空字符串
         """
         # 获取案件详情
-        url = f"{self.base_url}/work/make/getFinalData/{case_id}"
-        response = requests.get(url, headers=self.headers)
+        url = f"{self._urls['getFinalData']}{case_id}"
+        response = self.session.get(url, headers=self.headers)
 
         # 解析响应获取下载路径
-        case_info = response.json()
-        finalZipPath = f"{case_info['data']['finalZipPath']}?timestamp={random.randint(0, 1000000000)}"
+        case_info = ApiUtils.unwrap_json(response)
+        finalZipPath = (case_info.get("data") or {}).get("finalZipPath")
+        if not finalZipPath:
+            logger.error(f"获取软著材料路径失败: {case_id}, 响应: {case_info}")
+            return ""
+        finalZipPath = f"{finalZipPath}?timestamp={random.randint(0, 1000000000)}"
 
         save_path = os.path.join(output_dir, ApiUtils.get_filename_by_url(finalZipPath))
         save_path = ApiUtils.download_file(
-            self.download_base_urls, finalZipPath, save_path, desc="软著材料"
+            self.download_base_urls,
+            finalZipPath,
+            save_path,
+            desc="软著材料",
+            session=self.session,
+            head_trust=_HEAD_TRUST,
         )
 
         return save_path
@@ -168,26 +270,75 @@ class RHLTAPI:
         :return: 保存的文件路径，下载失败返回空字符串
         """
         # 获取案件详情
-        url = f"{self.base_url}/work/make/getCodeDataInfo/{case_id}"
-        response = requests.get(url, headers=self.headers)
+        url = f"{self._urls['getCodeDataInfo']}{case_id}"
+        response = self.session.get(url, headers=self.headers)
 
         # 解析响应获取下载路径
-        case_info = response.json()
-        regex = r"^(/)*profile/upload"
-        codePath = (
-            f"{case_info['data']['codePath']}?timestamp={random.randint(0, 1000000000)}"
-        )
+        case_info = ApiUtils.unwrap_json(response)
+        codePath = (case_info.get("data") or {}).get("codePath")
+        if not codePath:
+            logger.error(f"获取源码路径失败: {case_id}, 响应: {case_info}")
+            return ""
+        codePath = f"{codePath}?timestamp={random.randint(0, 1000000000)}"
         # 处理开头文件夹，这里已经写入self.download_base_urls，所以这里直接去掉
-        if re.match(regex, codePath):
-            codePath = re.sub(regex, "", codePath, count=1)
+        codePath = _CODE_PATH_RE.sub("", codePath, count=1)
 
         save_path = os.path.join(output_dir, f"{case_name}_code.zip")
         save_path = ApiUtils.download_file(
-            self.download_base_urls, codePath, save_path, desc="源码"
+            self.download_base_urls,
+            codePath,
+            save_path,
+            desc="源码",
+            session=self.session,
+            head_trust=_HEAD_TRUST,
         )
 
         return save_path
 
+    async def download_cases_async(self, case_ids, output_dir, concurrency=8):
+        """
+        并发下载多个案件的软著材料。
+
+        :param case_ids: 案件ID列表
+        :param output_dir: 下载文件的保存目录
+        :param concurrency: 最大并发数，默认8
+        :return: 与case_ids顺序一致的保存路径列表，失败项为空字符串
+        """
+        return await self._gather_limited(
+            self.download_case,
+            [(case_id, output_dir) for case_id in case_ids],
+            concurrency,
+        )
+
+    async def download_codes_async(self, cases, output_dir, concurrency=8):
+        """
+        并发下载多个案件的软著源代码。
+
+        :param cases: (案件ID, 案件名称) 元组列表
+        :param output_dir: 下载文件的保存目录
+        :param concurrency: 最大并发数，默认8
+        :return: 与cases顺序一致的保存路径列表，失败项为空字符串
+        """
+        return await self._gather_limited(
+            self.download_code,
+            [(case_id, case_name, output_dir) for case_id, case_name in cases],
+            concurrency,
+        )
+
+    async def _gather_limited(self, func, args_list, concurrency):
+        """在线程中并发执行同步下载方法，共享会话连接池，信号量限制并发数"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(args):
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(func, *args)
+                except Exception as e:
+                    logger.error(f"下载失败: {args[0]}, 错误: {e}")
+                    return ""
+
+        return await asyncio.gather(*[run(args) for args in args_list])
+
     def post_work_make_importData(self, params, filePath):
         """
         上传软著材料文件。
@@ -197,7 +348,7 @@ class RHLTAPI:
         :return: 上传响应结果
         """
         # 构建上传URL
-        url = f"{self.base_url}/work/make/importData"
+        url = self._urls["importData"]
         default_params = {}
         # 合并上传参数
         params = ApiUtils.combined_params(params, default_params)
@@ -207,12 +358,16 @@ class RHLTAPI:
             return
 
         # 打开文件并发送上传请求
-        files = {"file": open(filePath, "rb")}
-        response = requests.post(
-            url, params=params, files=files, headers=self.headers, timeout=600
-        )
+        with open(filePath, "rb") as f:
+            response = self.session.post(
+                url,
+                params=params,
+                files={"file": f},
+                headers=self.headers,
+                timeout=600,
+            )
         if response.status_code == 200:
-            return response.json()
+            return ApiUtils.unwrap_json(response)
         elif response.status_code == 504:
             logger.warning(f"上传文件 {filePath} 超时，正常现象")
             return {"code": 504, "msg": "上传超时"}
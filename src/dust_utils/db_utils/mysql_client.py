@@ -1,5 +1,15 @@
 class MySQLClient:
-    def __init__(self, host, port, user, password, database, charset="utf8mb4"):
+    def __init__(
+        self,
+        host,
+        port,
+        user,
+        password,
+        database,
+        charset="utf8mb4",
+        maxconnections=10,
+        mincached=2,
+    ):
         # 只有在实例化 MySQLClient() 时才会执行 import
         try:
             import pymysql
@@ -9,6 +19,12 @@ class MySQLClient:
             raise ImportError(
                 "检测到未安装 pymysql。请执行 'pip install pymysql' 以使用此功能。"
             )
+        try:
+            from dbutils.pooled_db import PooledDB
+        except ImportError:
+            raise ImportError(
+                "检测到未安装 dbutils。请执行 'pip install dbutils' 以使用此功能。"
+            )
 
         self.host = host
         self.port = port
@@ -16,36 +32,61 @@ class MySQLClient:
         self.password = password
         self.database = database
         self.charset = charset
-        self.connection = None
+
+        # 连接池：并发调用各自取用连接，ping=1 取用时检测断线并自动重连
+        self._pool = PooledDB(
+            creator=pymysql,
+            maxconnections=maxconnections,
+            mincached=mincached,
+            blocking=True,
+            ping=1,
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            charset=self.charset,
+        )
 
     def connect(self):
-        if not self.connection:
-            self.connection = self.pymysql.connect(
-                host=self.host,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                database=self.database,
-                charset=self.charset,
-            )
+        """从连接池取出一个连接，使用完毕后调用 close() 归还"""
+        return self._pool.connection()
 
-    def query(self, sql):
-        self.connect()
-        with self.connection.cursor(self.pymysql.cursors.DictCursor) as cursor:
-            cursor.execute(sql)
-            return cursor.fetchall()
+    def query(self, sql, args=None):
+        """执行查询，args 为参数化查询的参数，由驱动负责转义"""
+        conn = self.connect()
+        try:
+            with conn.cursor(self.pymysql.cursors.DictCursor) as cursor:
+                cursor.execute(sql, args)
+                return cursor.fetchall()
+        finally:
+            conn.close()
 
-    def execute(self, sql):
-        self.connect()
-        with self.connection.cursor() as cursor:
-            cursor.execute(sql)
-            self.connection.commit()
-            return cursor.rowcount
+    def execute(self, sql, args=None):
+        """执行写操作，args 为参数化查询的参数，返回影响行数"""
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(sql, args)
+                conn.commit()
+                return cursor.rowcount
+        finally:
+            conn.close()
+
+    def executemany(self, sql, seq_of_args):
+        """批量执行写操作，INSERT 语句会被驱动合并为单条多行插入，返回影响行数"""
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.executemany(sql, seq_of_args)
+                conn.commit()
+                return cursor.rowcount
+        finally:
+            conn.close()
 
     def close(self):
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        """关闭连接池中的所有连接"""
+        self._pool.close()
 
 
 # 示例
@@ -54,17 +95,19 @@ if __name__ == "__main__":
         host="localhost", port=3306, user="root", password="123456", database="test"
     )
 
-    # 查询（使用 f-string 拼接）
+    # 查询（参数化查询，由驱动转义参数）
     age = 18
-    sql = f"SELECT * FROM users WHERE age > {age}"
-    data = db.query(sql)
+    data = db.query("SELECT * FROM users WHERE age > %s", (age,))
     print(data)
 
     # 插入
-    name = "Alice"
-    age = 22
-    insert_sql = f"INSERT INTO users(name, age) VALUES('{name}', {age})"
-    affected = db.execute(insert_sql)
+    affected = db.execute("INSERT INTO users(name, age) VALUES(%s, %s)", ("Alice", 22))
+    print("影响行数:", affected)
+
+    # 批量插入
+    affected = db.executemany(
+        "INSERT INTO users(name, age) VALUES(%s, %s)", [("Bob", 20), ("Carol", 25)]
+    )
     print("影响行数:", affected)
 
     db.close()
@@ -4,6 +4,24 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # 未安装时使用标准库json
+
+
+def _dumps(data):
+    """序列化为带缩进、不转义中文的JSON字符串，优先使用orjson"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+            ).decode("utf-8")
+        except TypeError:
+            # 超过64位的整数等orjson不支持的数据，回退到标准库
+            pass
+    return json.dumps(data, ensure_ascii=False, indent=4)
+
 
 class CacheUtils:
 
@@ -27,10 +45,15 @@ class CacheUtils:
         """
 
         # 优先尝试从缓存读取（仅测试模式）
-        if is_test and os.path.exists(json_path):
+        if is_test:
             try:
+                if orjson is not None:
+                    with open(json_path, "rb") as f:
+                        return orjson.loads(f.read())
                 with open(json_path, "r", encoding="utf-8") as f:
                     return json.load(f)
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 logger.warning(f"缓存 JSON 读取失败，准备重新生成：{json_path}")
 
@@ -39,13 +62,14 @@ class CacheUtils:
 
         # 确保父目录存在
         dir_path = os.path.dirname(json_path)
-        if dir_path and not os.path.exists(dir_path):
+        if dir_path:
             os.makedirs(dir_path, exist_ok=True)
 
         # 写入缓存（缓存失败不影响主流程）
         try:
+            content = _dumps(data_result)
             with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(data_result, f, ensure_ascii=False, indent=4)
+                f.write(content)
         except Exception:
             logger.exception(f"缓存 JSON 写入失败：{json_path}")
 
@@ -61,13 +85,13 @@ class CacheUtils:
         """
         try:
             dir_path = os.path.dirname(file_path)
-            if dir_path and not os.path.exists(dir_path):
+            if dir_path:
                 os.makedirs(dir_path, exist_ok=True)
 
             if isinstance(data, str):
                 content = data
             elif isinstance(data, (dict, list)):
-                content = json.dumps(data, ensure_ascii=False, indent=4)
+                content = _dumps(data)
             else:
                 raise ValueError("数据格式错误")
 
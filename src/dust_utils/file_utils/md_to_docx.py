@@ -2,9 +2,31 @@ import os
 import json
 import sys
 import logging
+import functools
+import re
+from collections.abc import Mapping
 
 logger = logging.getLogger(__name__)
 
+# 从列表样式名（如 List Bullet 2）中提取层级数字
+_LIST_LEVEL_RE = re.compile(r"(\d+)")
+
+
+@functools.lru_cache(maxsize=4)
+def _load_styles(path):
+    """
+    读取并缓存样式配置文件中的默认样式，同一路径只读取一次
+
+    Args:
+        path (str): style.json 文件路径
+
+    Returns:
+        dict: {样式名: 样式配置}，返回的是共享对象，调用方不要修改
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("default", {})
+
+
 # region 辅助类
 
 
@@ -45,16 +67,16 @@ class ListNode:
     用于构建和存储 Markdown 列表的树状结构
     """
 
-    def __init__(self, content="", ordered=False, level=0):
+    def __init__(self, inline_token=None, ordered=False, level=0):
         """
         初始化列表节点
 
         Args:
-            content (str): 列表项的内容文本
+            inline_token (Token): 列表项已解析好的 inline token
             ordered (bool): 是否为有序列表
             level (int): 列表嵌套层级（从0开始）
         """
-        self.content = content
+        self.inline_token = inline_token
         self.ordered = ordered
         self.level = level
         self.children = []
@@ -75,6 +97,17 @@ class MdToDocx:
         创建 AST 解析器实例
         """
         self.parser = MarkdownAstParser()
+        # token 类型 -> 处理方法，处理方法返回下一个待处理的 token 索引
+        self._token_dispatch = {
+            "heading_open": self._on_heading_open,
+            "inline": self._on_inline,
+            "bullet_list_open": self._on_list_open,
+            "ordered_list_open": self._on_list_open,
+        }
+        # 远程图片缓存：{解码后的URL: 图片字节}
+        self._img_cache = {}
+        # 下载图片复用的会话，首次使用时创建
+        self._session = None
 
     def _ensure_docx(self):
         """
@@ -97,16 +130,36 @@ class MdToDocx:
         self.WD_ALIGN_PARAGRAPH = WD_ALIGN_PARAGRAPH
         self.WD_LINE_SPACING = WD_LINE_SPACING
         self.OxmlElement = OxmlElement
+        # 预先计算常用的带命名空间标签名，避免热点循环中反复调用 qn
+        self._QN = {
+            k: qn(k)
+            for k in (
+                "w:textAlignment",
+                "w:snapToGrid",
+                "w:kinsoku",
+                "w:overflowPunct",
+                "w:adjustRightInd",
+                "w:val",
+                "w:lang",
+                "w:eastAsia",
+                "w:ascii",
+                "w:hAnsi",
+                "w:cs",
+                "w:type",
+                "w:charSpace",
+                "w:outlineLvl",
+            )
+        }
         self._docx_loaded = True
 
-    def convert(self, md_text: str, output_path: str, styles: list = None):
+    def convert(self, md_text: str, output_path: str, styles: dict = None):
         """
         执行转换流程：Markdown -> Word
 
         Args:
             md_text (str): 原始 Markdown 文本
             output_path (str): 输出 Word 文档的路径 (.docx)
-            styles (list, optional): 自定义样式配置列表. Defaults to None.
+            styles (dict, optional): 自定义样式配置 {样式名: 样式配置}. Defaults to None.
         """
         # 确保按需加载 python-docx
         self._ensure_docx()
@@ -119,16 +172,17 @@ class MdToDocx:
         self._enable_doc_grid()
 
         tokens = self.parser.parse(md_text)
+        # 写入前并发下载所有远程图片
+        self._prefetch_images(tokens)
         # 获取默认样式
         if styles is None:
-            styles = []
             current_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
-            with open(
-                os.path.join(current_dir, "style.json"), "r", encoding="utf-8"
-            ) as f:
-                styles = json.load(f)
-                styles = styles.get("default", [])
-        self.styles = styles
+            styles = _load_styles(os.path.join(current_dir, "style.json"))
+        if not isinstance(styles, Mapping):
+            raise TypeError(f"样式配置应为字典，实际为 {type(styles).__name__}")
+        self.styles = dict(styles)
+        self._resolve_styles()
+        self._styled_paragraphs = set()
 
         logger.info("正在写入Word文档...")
         self._write_tokens(tokens)
@@ -147,41 +201,56 @@ class MdToDocx:
             paragraph_style (str, optional): 当前段落应用的样式名称. Defaults to None.
         """
         i = 0
+        dispatch = self._token_dispatch
         while i < len(tokens):
-            t = tokens[i]
+            handler = dispatch.get(tokens[i].type)
+            if handler is None:
+                i += 1
+            else:
+                i = handler(tokens, i, paragraph, paragraph_style)
+
+    def _on_heading_open(self, tokens, i, paragraph, paragraph_style):
+        """
+        处理标题：heading_open 后紧跟标题内容的 inline token
 
-            # 解析标题级别
-            if t.type == "heading_open":
-                self._current_heading_level = int(t.tag[1])
+        Returns:
+            int: 下一个待处理的 token 索引
+        """
+        level = int(tokens[i].tag[1])
+        i += 1
+        if i >= len(tokens) or tokens[i].type != "inline":
+            return i
 
-            # 解析标题内容
-            elif t.type == "inline" and hasattr(self, "_current_heading_level"):
-                if paragraph is None:
-                    paragraph = self.doc.add_heading(
-                        t.content, level=self._current_heading_level
-                    )
-                else:
-                    paragraph.add_run(t.content)
-                # 应用标题样式
-                self._set_paragraph_style(paragraph, f"h{self._current_heading_level}")
-                paragraph = None
-                # 重置标题级别
-                del self._current_heading_level
-
-            # 列表处理
-            elif t.type in ("bullet_list_open", "ordered_list_open"):
-                # 先解析当前列表为树结构
-                nodes, next_i = self._parse_list(tokens, i)
-                # 再写入 Word
-                self._write_list_to_word(nodes)
-                i = next_i
-                continue  # 跳过 i += 1
+        # 直接创建普通段落，样式完全由 _set_paragraph_style 设置，
+        # 避免 add_heading 先套用内置标题样式再被覆盖
+        if paragraph is None:
+            paragraph = self.doc.add_paragraph()
+        paragraph.add_run(tokens[i].content)
+        # 应用标题样式
+        self._set_paragraph_style(paragraph, f"h{level}")
+        self._set_outline_level(paragraph, level - 1)
+        return i + 1
 
-            # 普通段落 + 图片
-            elif t.type == "inline":
-                self._handle_inline(t, paragraph, paragraph_style)
+    def _on_inline(self, tokens, i, paragraph, paragraph_style):
+        """
+        处理普通段落 + 图片
 
-            i += 1
+        Returns:
+            int: 下一个待处理的 token 索引
+        """
+        self._handle_inline(tokens[i], paragraph, paragraph_style)
+        return i + 1
+
+    def _on_list_open(self, tokens, i, paragraph, paragraph_style):
+        """
+        处理列表：先解析当前列表为树结构，再写入 Word
+
+        Returns:
+            int: 列表结束后的 token 索引
+        """
+        nodes, next_i = self._parse_list(tokens, i)
+        self._write_list_to_word(nodes)
+        return next_i
 
     def _handle_inline(self, token, paragraph=None, paragraph_style=None):
         """
@@ -195,6 +264,7 @@ class MdToDocx:
         if paragraph_style is None:
             paragraph_style = "text"
 
+        has_text = False
         for child in token.children:
             if paragraph is None:
                 paragraph = self.doc.add_paragraph()
@@ -207,7 +277,11 @@ class MdToDocx:
             # ✅ 普通文本
             elif child.type == "text" and child.content.strip() != "":
                 paragraph.add_run(child.content)
-                self._set_paragraph_style(paragraph, paragraph_style)
+                has_text = True
+
+        # 所有 run 添加完后统一应用一次样式
+        if has_text:
+            self._set_paragraph_style(paragraph, paragraph_style)
 
     def _add_image(self, src: str, paragraph=None):
         """
@@ -219,19 +293,18 @@ class MdToDocx:
             paragraph (docx.text.paragraph.Paragraph, optional): 目标段落. Defaults to None.
         """
 
-        # 延迟导入 requests/base64/tempfile 等
+        # 延迟导入 base64/io 等
         self._ensure_docx()
         from urllib.parse import unquote
-        import requests
         import base64
-        import tempfile
+        import io
 
         # ---------- 1️⃣ 获取图片 ----------
         if src.startswith("http"):
             src = unquote(src)
-            r = requests.get(src, timeout=10)
-            r.raise_for_status()
-            img_bytes = r.content
+            img_bytes = self._img_cache.get(src)
+            if img_bytes is None:
+                img_bytes = self._fetch_image(src)
 
         elif src.startswith("data:image"):
             img_bytes = base64.b64decode(src.split(",", 1)[1])
@@ -241,10 +314,6 @@ class MdToDocx:
             with open(src, "rb") as f:
                 img_bytes = f.read()
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmp:
-            tmp.write(img_bytes)
-            tmp_path = tmp.name
-
         # ---------- 2️⃣ paragraph ----------
         if paragraph is None:
             paragraph = self.doc.add_paragraph()
@@ -281,7 +350,72 @@ class MdToDocx:
         if len(paragraph.runs) > 0:
             paragraph.add_run("\n")
         run = paragraph.add_run()
-        run.add_picture(tmp_path, width=available_width)
+        # 直接传入内存流，无需落地临时文件
+        run.add_picture(io.BytesIO(img_bytes), width=available_width)
+
+    def _get_session(self):
+        """
+        获取下载图片用的会话，按需创建并配置连接池
+        """
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+        return self._session
+
+    def _fetch_image(self, src: str):
+        """
+        下载远程图片
+
+        Args:
+            src (str): 已解码的图片URL
+
+        Returns:
+            bytes: 图片内容
+        """
+        r = self._get_session().get(src, timeout=10)
+        r.raise_for_status()
+        return r.content
+
+    def _prefetch_images(self, tokens):
+        """
+        收集 token 流中的全部远程图片并用线程池并发下载，结果存入 self._img_cache
+        下载失败的图片不缓存，写入时会重新下载并抛出异常
+
+        Args:
+            tokens (list): token 列表
+        """
+        from urllib.parse import unquote
+        from concurrent.futures import ThreadPoolExecutor
+
+        srcs = set()
+        for t in tokens:
+            for child in t.children or ():
+                if child.type == "image":
+                    src = child.attrs.get("src") or ""
+                    if src.startswith("http"):
+                        src = unquote(src)
+                        if src not in self._img_cache:
+                            srcs.add(src)
+        if not srcs:
+            return
+
+        def fetch(src):
+            try:
+                return src, self._fetch_image(src)
+            except Exception as e:
+                logger.warning(f"预下载图片失败: {src}, 错误: {e}")
+                return src, None
+
+        logger.info(f"正在下载 {len(srcs)} 张图片...")
+        with ThreadPoolExecutor(max_workers=min(16, len(srcs))) as executor:
+            for src, img_bytes in executor.map(fetch, srcs):
+                if img_bytes is not None:
+                    self._img_cache[src] = img_bytes
 
     # endregion
 
@@ -311,7 +445,7 @@ class MdToDocx:
                 j = i + 1
                 while j < len(tokens) and tokens[j].type != "list_item_close":
                     if tokens[j].type == "inline":
-                        node.content = tokens[j].content
+                        node.inline_token = tokens[j]
                     # 子列表
                     elif tokens[j].type in ("bullet_list_open", "ordered_list_open"):
                         child_nodes, next_j = self._parse_list(tokens, j, level + 1)
@@ -346,8 +480,11 @@ class MdToDocx:
 
                 paragraph = self.doc.add_paragraph(style=style)
                 self._set_paragraph_style(paragraph, f"li")
-                tokens = self.parser.parse(node.content)
-                self._write_tokens(tokens, paragraph=paragraph, paragraph_style=f"li")
+                # 直接使用外层解析得到的 inline token，无需再次解析列表项文本
+                if node.inline_token is not None:
+                    self._handle_inline(
+                        node.inline_token, paragraph=paragraph, paragraph_style="li"
+                    )
 
                 # 递归写入子列表
                 if node.children:
@@ -407,9 +544,7 @@ class MdToDocx:
             name = style.name.lower()
             if name.startswith("list"):
                 # 从样式名中提取数字作为层级
-                import re
-
-                match = re.search(r"(\d+)", name)
+                match = _LIST_LEVEL_RE.search(name)
                 return int(match.group(1)) - 1 if match else 0
 
         # 3️⃣ 非列表
@@ -419,6 +554,51 @@ class MdToDocx:
 
     # region 样式设置
 
+    def _resolve_styles(self):
+        """
+        预先解析每个样式的对齐方式、磅值和颜色，避免每个段落/run 重复计算
+        """
+        align_map = {
+            "left": self.WD_ALIGN_PARAGRAPH.LEFT,
+            "center": self.WD_ALIGN_PARAGRAPH.CENTER,
+            "right": self.WD_ALIGN_PARAGRAPH.RIGHT,
+            "justify": self.WD_ALIGN_PARAGRAPH.JUSTIFY,
+        }
+        self._resolved_styles = {}
+        for name, style in self.styles.items():
+            if not style:
+                continue
+            font_size = style.get("font_size", 11)
+            resolved = {
+                "alignment": (
+                    align_map.get(style["align"], self.WD_ALIGN_PARAGRAPH.LEFT)
+                    if "align" in style
+                    else None
+                ),
+                "line_spacing": style.get("line_spacing"),
+                "space_before": self.Pt(style.get("space_before", 0)),
+                "space_after": self.Pt(style.get("space_after", 0)),
+                "first_line_indent": (
+                    self.Pt(font_size * style["first_line_indent"])
+                    if "first_line_indent" in style
+                    else None
+                ),
+                "font_name": style.get("font_name", "微软雅黑"),
+                "font_size": self.Pt(font_size),
+                "bold": style.get("bold", False),
+                "italic": style.get("italic", False),
+                "underline": style.get("underline", False),
+                "font_color": None,
+            }
+            if "font_color" in style:
+                c = style["font_color"].lstrip("#")
+                resolved["font_color"] = self.RGBColor(
+                    int(c[0:2], 16),
+                    int(c[2:4], 16),
+                    int(c[4:6], 16),
+                )
+            self._resolved_styles[name] = resolved
+
     def _set_paragraph_style(self, paragraph, style_name):
         """
         应用段落和字体样式
@@ -433,62 +613,58 @@ class MdToDocx:
         """
         # 确保 docx 系列符号已按需加载
         self._ensure_docx()
-        style = self.styles.get(style_name)
+        style = self._resolved_styles.get(style_name)
         if not style:
             return
 
+        # 同一段落以同一样式、相同 run 数量重复设置时直接跳过；
+        # 计入 run 数量，保证先设样式后追加文本的段落仍会设置新 run。
+        # 直接以 _p 元素作为键并在 convert 期间持有引用：lxml 代理对象释放后
+        # id() 会被复用，以 id 为键会误跳过其他段落
+        runs = paragraph.runs
+        key = (paragraph._p, style_name, len(runs))
+        if key in self._styled_paragraphs:
+            return
+        self._styled_paragraphs.add(key)
+
         # =====================================================
         # 1️⃣ 段落级格式（pPr）
         # =====================================================
         p_format = paragraph.paragraph_format
         pPr = paragraph._element.get_or_add_pPr()
 
+        # 一次性收集已有子元素，避免每个属性都扫描一遍 pPr
+        existing = {child.tag: child for child in pPr}
+
         # ---- textAlignment = auto（与人工文档一致）
-        text_align = pPr.find(self.qn("w:textAlignment"))
-        if text_align is None:
-            text_align = self.OxmlElement("w:textAlignment")
-            pPr.append(text_align)
-        text_align.set(self.qn("w:val"), "auto")
+        text_align = self._get_or_append(pPr, existing, "w:textAlignment")
+        text_align.set(self._QN["w:val"], "auto")
 
         # ---- snapToGrid = 1（关键：启用基线网格）
-        snap = pPr.find(self.qn("w:snapToGrid"))
-        if snap is None:
-            snap = self.OxmlElement("w:snapToGrid")
-            pPr.append(snap)
-        snap.set(self.qn("w:val"), "1")
+        snap = self._get_or_append(pPr, existing, "w:snapToGrid")
+        snap.set(self._QN["w:val"], "1")
 
         # ---- 中文排版辅助属性（不影响西文）
-        for tag in ["w:kinsoku", "w:overflowPunct", "w:adjustRightInd"]:
-            if pPr.find(self.qn(tag)) is None:
-                pPr.append(self.OxmlElement(tag))
+        for tag in ("w:kinsoku", "w:overflowPunct", "w:adjustRightInd"):
+            self._get_or_append(pPr, existing, tag)
 
         # ---- 对齐方式
-        if "align" in style:
-            align_map = {
-                "left": self.WD_ALIGN_PARAGRAPH.LEFT,
-                "center": self.WD_ALIGN_PARAGRAPH.CENTER,
-                "right": self.WD_ALIGN_PARAGRAPH.RIGHT,
-                "justify": self.WD_ALIGN_PARAGRAPH.JUSTIFY,
-            }
-            p_format.alignment = align_map.get(
-                style["align"], self.WD_ALIGN_PARAGRAPH.LEFT
-            )
+        if style["alignment"] is not None:
+            p_format.alignment = style["alignment"]
 
         # ---- 行距（不固定倍数）
-        if "line_spacing" in style:
+        if style["line_spacing"] is not None:
             p_format.line_spacing = style["line_spacing"]
             p_format.line_spacing_rule = self.WD_LINE_SPACING.MULTIPLE
 
-        p_format.space_before = self.Pt(style.get("space_before", 0))
-        p_format.space_after = self.Pt(style.get("space_after", 0))
+        p_format.space_before = style["space_before"]
+        p_format.space_after = style["space_after"]
 
         # =====================================================
         # 2️⃣ 缩进规则
         # =====================================================
-        if "first_line_indent" in style:
-            p_format.first_line_indent = self.Pt(
-                style.get("font_size", 11) * style["first_line_indent"]
-            )
+        if style["first_line_indent"] is not None:
+            p_format.first_line_indent = style["first_line_indent"]
 
         # 🔥 li 特殊处理
         if style_name == "li":
@@ -498,42 +674,75 @@ class MdToDocx:
         # =====================================================
         # 3️⃣ 字符级（rPr）
         # =====================================================
-        font_name = style.get("font_name", "微软雅黑")
-        font_size = style.get("font_size", 11)
+        font_name = style["font_name"]
+        font_size = style["font_size"]
+        qn_val = self._QN["w:val"]
+        qn_east_asia = self._QN["w:eastAsia"]
+        qn_lang = self._QN["w:lang"]
 
-        for run in paragraph.runs:
+        for run in runs:
             font = run.font
             rPr = run._element.get_or_add_rPr()
 
             # ---- 字体四槽位（ascii / hAnsi / eastAsia / cs），
             # 解决“中文字体不生效”问题
             rFonts = rPr.get_or_add_rFonts()
-            rFonts.set(self.qn("w:ascii"), font_name)
-            rFonts.set(self.qn("w:hAnsi"), font_name)
-            rFonts.set(self.qn("w:eastAsia"), font_name)
-            rFonts.set(self.qn("w:cs"), font_name)
+            rFonts.set(self._QN["w:ascii"], font_name)
+            rFonts.set(self._QN["w:hAnsi"], font_name)
+            rFonts.set(qn_east_asia, font_name)
+            rFonts.set(self._QN["w:cs"], font_name)
 
             # ---- 语言环境
-            lang = rPr.find(self.qn("w:lang"))
+            lang = rPr.find(qn_lang)
             if lang is None:
                 lang = self.OxmlElement("w:lang")
                 rPr.append(lang)
-            lang.set(self.qn("w:val"), "en-US")
-            lang.set(self.qn("w:eastAsia"), "zh-CN")
+            lang.set(qn_val, "en-US")
+            lang.set(qn_east_asia, "zh-CN")
 
             # ---- 基础样式
-            font.size = self.Pt(font_size)
-            font.bold = style.get("bold", False)
-            font.italic = style.get("italic", False)
-            font.underline = style.get("underline", False)
+            font.size = font_size
+            font.bold = style["bold"]
+            font.italic = style["italic"]
+            font.underline = style["underline"]
 
-            if "font_color" in style:
-                c = style["font_color"].lstrip("#")
-                font.color.rgb = self.RGBColor(
-                    int(c[0:2], 16),
-                    int(c[2:4], 16),
-                    int(c[4:6], 16),
-                )
+            if style["font_color"] is not None:
+                font.color.rgb = style["font_color"]
+
+    def _get_or_append(self, parent, existing, tag):
+        """
+        从已收集的子元素中取出指定标签，不存在则创建并追加到父元素
+
+        Args:
+            parent: 父元素
+            existing (dict): {带命名空间的标签名: 子元素}，新建元素会同步写入
+            tag (str): 形如 "w:snapToGrid" 的标签名
+
+        Returns:
+            子元素
+        """
+        key = self._QN[tag]
+        element = existing.get(key)
+        if element is None:
+            element = self.OxmlElement(tag)
+            parent.append(element)
+            existing[key] = element
+        return element
+
+    def _set_outline_level(self, paragraph, level):
+        """
+        设置段落大纲级别，使标题段落出现在导航窗格中
+
+        Args:
+            paragraph (docx.text.paragraph.Paragraph): 目标段落
+            level (int): 大纲级别（从0开始）
+        """
+        pPr = paragraph._element.get_or_add_pPr()
+        outline = pPr.find(self._QN["w:outlineLvl"])
+        if outline is None:
+            outline = self.OxmlElement("w:outlineLvl")
+            pPr.append(outline)
+        outline.set(self._QN["w:val"], str(level))
 
     def _enable_doc_grid(self):
         """
@@ -555,9 +764,9 @@ class MdToDocx:
             sectPr.append(docGrid)
 
         # ✅ 核心：始终设置为 lines
-        docGrid.set(self.qn("w:type"), "lines")
+        docGrid.set(self._QN["w:type"], "lines")
 
         # 可选：显式关闭字符网格（推荐）
-        docGrid.set(self.qn("w:charSpace"), "0")
+        docGrid.set(self._QN["w:charSpace"], "0")
 
     # endregion
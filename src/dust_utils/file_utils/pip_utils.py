@@ -5,6 +5,7 @@ import sys
 import os
 import inspect
 import logging
+import functools
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -95,6 +96,24 @@ class PipUtils:
                 os.path.abspath(inspect.stack()[1].filename)
             )  # 调用者所在目录
 
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def _lookup_module(module_name: str):
+        """
+        查找模块位置和版本号，结果缓存避免重复遍历 sys.path 和解析 METADATA
+
+        Returns:
+            tuple: (是否已安装, 模块位置, 版本号)，无版本信息时版本号为None
+        """
+        spec = importlib.util.find_spec(module_name)
+        if spec is None:
+            return False, None, None
+        try:
+            return True, spec.origin, importlib.metadata.version(module_name)
+        except importlib.metadata.PackageNotFoundError:
+            # 极少数情况：find_spec 找到但 metadata 没版本（如内置模块或特殊安装）
+            return True, spec.origin, None
+
     @staticmethod
     def check_pip_module(module_name: str):
         """
@@ -102,23 +121,20 @@ class PipUtils:
         - 已安装 → 输出版本号
         - 未安装 → 输出提示并退出程序
         """
-        spec = importlib.util.find_spec(module_name)
-        if spec is None:
+        installed, origin, version = PipUtils._lookup_module(module_name)
+        if not installed:
             logger.error(
                 f"模块 '{module_name}' 未安装，请执行: pip install {module_name}"
             )
             sys.exit(1)
+        elif version is not None:
+            logger.debug(
+                f"模块 '{module_name}' 已安装，版本: {version}（位于: {origin}）"
+            )
         else:
-            try:
-                version = importlib.metadata.version(module_name)
-                logger.debug(
-                    f"模块 '{module_name}' 已安装，版本: {version}（位于: {spec.origin}）"
-                )
-            except importlib.metadata.PackageNotFoundError:
-                # 极少数情况：find_spec 找到但 metadata 没版本（如内置模块或特殊安装）
-                logger.debug(
-                    f"模块 '{module_name}' 已安装（位于: {spec.origin}），但无法获取版本信息"
-                )
+            logger.debug(
+                f"模块 '{module_name}' 已安装（位于: {origin}），但无法获取版本信息"
+            )
 
 
 if __name__ == "__main__":
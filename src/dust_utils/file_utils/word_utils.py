@@ -4,6 +4,11 @@ import re
 # 初始化日志
 logger = logging.getLogger(__name__)
 
+# {{ var }} 形式的变量
+_VAR_RE = re.compile(r"\{\{(.*?)\}\}")
+# 变量名规范化时去除的空白
+_WS_RE = re.compile(r"\s+")
+
 
 class WordUtils:
     """
@@ -22,27 +27,21 @@ class WordUtils:
         """
         logger.info(f"开始替换文档变量\n路径： {docx_path}\n变量：{params}")
         from docx import Document
+        from docx.text.paragraph import Paragraph
 
         doc = Document(docx_path)
+        body = doc._body
 
-        # 处理普通段落
-        for p in doc.paragraphs:
-            WordUtils._process_paragraph(p, params)
-
-        # 处理表格
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    WordUtils._process_cell(cell, params)
+        # 用一次 XPath 在 lxml 层筛出文本含 "{{" 的段落（含表格内段落），
+        # string(.) 会拼接全部文本节点，"{{" 被拆在多个 run 中也能命中；
+        # 其余段落不创建 Paragraph 对象
+        candidates = doc.element.body.xpath(".//w:p[contains(string(.), '{{')]")
+        for p_element in candidates:
+            WordUtils._process_paragraph(Paragraph(p_element, body), params)
 
         doc.save(docx_path)
         logger.success(f"替换文档变量完成\n路径： {docx_path}")
 
-    @staticmethod
-    def _process_cell(cell: "_Cell", params: dict):
-        for p in cell.paragraphs:
-            WordUtils._process_paragraph(p, params)
-
     @staticmethod
     def _process_paragraph(p: "Paragraph", params: dict):
         """
@@ -52,25 +51,33 @@ class WordUtils:
             p (Paragraph): 输入段落实例
             params (dict): 变量替换字典，键为变量名，值为替换值
         """
-        if not p.runs:
+        runs = p.runs
+        if not runs:
             return
 
-        # 拼接所有 run 的文本
-        full_text = "".join(run.text for run in p.runs)
-
-        # 判断是否包含变量
-        if "{{" not in full_text:
+        # 一次遍历收集文本并判断是否包含变量，不含变量时不拼接文本
+        # "{{" 可能被拆分在相邻两个 run 中，需同时检查上一个 run 的结尾
+        parts = []
+        has_var = False
+        prev_tail = ""
+        for run in runs:
+            t = run.text
+            parts.append(t)
+            if not has_var and t:
+                if "{{" in t or (prev_tail == "{" and t[0] == "{"):
+                    has_var = True
+                prev_tail = t[-1]
+        if not has_var:
             return
 
         # 变量替换
-        full_text = WordUtils.replace_vars_fuzzy(full_text, params)
+        full_text = WordUtils.replace_vars_fuzzy("".join(parts), params)
 
         # 取中间 run 的样式
-        mid_index = len(p.runs) // 2
-        src_run = p.runs[mid_index]
+        src_run = runs[len(runs) // 2]
 
         # 清空原有 runs
-        for run in p.runs:
+        for run in runs:
             run.text = ""
 
         # 只保留一个 run
@@ -98,16 +105,14 @@ class WordUtils:
         """
 
         # 预处理参数：key 统一规范化
-        norm_params = {re.sub(r"\s+", "", k).lower(): str(v) for k, v in params.items()}
-
-        pattern = re.compile(r"\{\{(.*?)\}\}")
+        norm_params = {_WS_RE.sub("", k).lower(): str(v) for k, v in params.items()}
 
         def repl(match):
             raw_key = match.group(1)
-            norm_key = re.sub(r"\s+", "", raw_key).lower()
+            norm_key = _WS_RE.sub("", raw_key).lower()
             return norm_params.get(norm_key, match.group(0))
 
-        return pattern.sub(repl, text)
+        return _VAR_RE.sub(repl, text)
 
     @staticmethod
     def _copy_font_name(src_run, target_run):
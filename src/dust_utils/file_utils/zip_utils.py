@@ -1,10 +1,25 @@
 import os
+import copy
 import shutil
+import struct
 import zipfile
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# zip条目通用标志位
+_FLAG_ENCRYPTED = 0x1
+_FLAG_DATA_DESCRIPTOR = 0x8
+# 复制条目数据时的缓冲区大小
+_COPY_BUFSIZE = 1024 * 1024
+# 直接复制压缩数据依赖的 zipfile 内部实现，任一缺失时回退为公开 API 的流式复制
+_RAW_COPY_SUPPORTED = all(
+    hasattr(zipfile, name)
+    for name in ("_strip_extra", "_FH_FILENAME_LENGTH", "_FH_EXTRA_FIELD_LENGTH")
+)
+_RAW_COPY_ZIP_ATTRS = ("_lock", "start_dir", "_didModify")
+
 
 class ZipUtils:
     """
@@ -51,12 +66,15 @@ class ZipUtils:
                 raise
         # 确保目标路径存在
         os.makedirs(extract_path, exist_ok=True)
+        extract_root = os.path.realpath(extract_path)
 
         # 第三步：解压文件处理
         # 使用zipfile打开文件时指定编码格式，避免中文乱码
         with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            # 遍历压缩包内的所有文件
-            for file in zip_ref.namelist():
+            members = []
+            # 遍历压缩包内的所有文件，串行处理文件名和目标路径
+            for info in zip_ref.infolist():
+                file = info.filename
                 # 处理文件名编码问题，优先尝试GBK解码
                 try:
                     filename = file.encode("cp437").decode("gbk")
@@ -64,8 +82,22 @@ class ZipUtils:
                     # 解码失败时保持原文件名
                     filename = file
 
-                # 处理目标路径上的已存在文件
                 target_path = os.path.join(extract_path, filename)
+                info.filename = filename
+                # 含 ../ 或绝对路径的条目可能指向解压目录之外，不在此处删除或创建目录，
+                # 交给 zipfile.extract 清理路径后在主线程中解压
+                real_target = os.path.realpath(target_path)
+                try:
+                    inside = os.path.commonpath([extract_root, real_target]) == extract_root
+                except ValueError:
+                    # Windows 下位于不同盘符
+                    inside = False
+                if not inside:
+                    logger.warning(f"压缩包条目 {filename} 的路径超出解压目录，按清理后的路径解压")
+                    zip_ref.extract(info, extract_path)
+                    continue
+
+                # 处理目标路径上的已存在文件
                 if os.path.exists(target_path):
                     # 根据文件类型选择删除方式
                     if os.path.isdir(target_path):
@@ -73,27 +105,41 @@ class ZipUtils:
                     else:
                         os.remove(target_path)
 
-                # 执行解压操作
-                zip_ref.extract(file, extract_path)
-                # 如果文件名发生了变化，进行重命名
-                if file != filename:
-                    os.rename(
-                        os.path.join(extract_path, file),
-                        os.path.join(extract_path, filename),
-                    )
+                # 直接按解码后的文件名解压，无需解压后再重命名
+                if info.is_dir():
+                    zip_ref.extract(info, extract_path)
+                else:
+                    # 预先创建父目录，避免多线程同时创建同一目录
+                    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                    members.append(info)
+
+        # 各条目的DEFLATE数据相互独立，按线程分组并行解压，每个线程使用独立的文件句柄
+        workers = min(os.cpu_count() or 1, len(members))
+        if workers:
+
+            def extract_members(group):
+                with zipfile.ZipFile(zip_path, "r") as zip_ref:
+                    for info in group:
+                        zip_ref.extract(info, extract_path)
+
+            groups = [members[i::workers] for i in range(workers)]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(extract_members, groups))
 
         # 第四步：优化解压结果的目录结构
         # 递归处理单一子目录的情况
         def flatten_single_dir(dir_path):
-            items = os.listdir(dir_path)
+            # scandir 的 DirEntry 自带类型信息，无需逐项 stat
+            with os.scandir(dir_path) as it:
+                items = list(it)
             # 如果目录中只有一个子目录，则继续处理
-            if len(items) == 1 and os.path.isdir(os.path.join(dir_path, items[0])):
-                source_dir = os.path.join(dir_path, items[0])
+            if len(items) == 1 and items[0].is_dir(follow_symlinks=False):
+                source_dir = items[0].path
                 # 将子目录中的所有内容移动到父目录
-                for item in os.listdir(source_dir):
-                    source_item = os.path.join(source_dir, item)
-                    dest_item = os.path.join(dir_path, item)
-                    shutil.move(source_item, dest_item)
+                with os.scandir(source_dir) as it:
+                    entries = list(it)
+                for entry in entries:
+                    ZipUtils._move(entry.path, os.path.join(dir_path, entry.name))
                 # 清理空的子目录
                 os.rmdir(source_dir)
                 # 递归处理，以防还有更深层的单一子目录
@@ -105,6 +151,21 @@ class ZipUtils:
         # 记录操作完成的日志
         logger.info(f"已解压文件到 {extract_path}")
 
+    @staticmethod
+    def _move(src, dst):
+        """
+        移动文件或目录，同一文件系统内直接重命名；
+        跨文件系统时文件走 shutil.copy2（内核 copy_file_range/sendfile 快速路径）后删除源文件
+        """
+        try:
+            os.rename(src, dst)
+        except OSError:
+            if os.path.isdir(src):
+                shutil.move(src, dst)
+            else:
+                shutil.copy2(src, dst, follow_symlinks=False)
+                os.remove(src)
+
     @staticmethod
     def zip_add_files(zip_path: str, files: list, is_repeat_skip: bool = True):
         """
@@ -127,56 +188,129 @@ class ZipUtils:
             logger.error(f"zip文件 {zip_path} 不存在")
             raise FileNotFoundError(f"zip文件 {zip_path} 不存在")
 
-        # 以追加模式打开zip文件
-        with zipfile.ZipFile(zip_path, "a") as zip_ref:
-            for file_item in files:
-                # 处理输入参数，支持字符串路径或元组格式
-                if isinstance(file_item, tuple):
-                    file_path, arcname = file_item
-                elif isinstance(file_item, str):
-                    file_path = file_item
-                    arcname = os.path.basename(file_path)
-                else:
-                    raise ValueError(
-                        "files列表中的元素必须是字符串路径或(文件路径, zip内路径)的元组"
-                    )
+        # 第一步：整理要添加的文件，同名文件按is_repeat_skip保留第一个或最后一个
+        new_entries = {}
+        for file_item in files:
+            # 处理输入参数，支持字符串路径或元组格式
+            if isinstance(file_item, tuple):
+                file_path, arcname = file_item
+            elif isinstance(file_item, str):
+                file_path = file_item
+                arcname = os.path.basename(file_path)
+            else:
+                raise ValueError(
+                    "files列表中的元素必须是字符串路径或(文件路径, zip内路径)的元组"
+                )
 
-                # 检查要添加的文件是否存在
-                if not os.path.exists(file_path):
-                    logger.warning(f"要添加的文件 {file_path} 不存在，已跳过")
-                    continue
+            # 检查要添加的文件是否存在
+            if not os.path.exists(file_path):
+                logger.warning(f"要添加的文件 {file_path} 不存在，已跳过")
+                continue
 
-                # 根据is_repeat_skip参数处理已存在的文件
-                if arcname in zip_ref.namelist():
-                    if is_repeat_skip:
-                        logger.info(f"zip中已存在文件 {arcname}，已跳过")
+            if arcname in new_entries and is_repeat_skip:
+                logger.info(f"zip中已存在文件 {arcname}，已跳过")
+                continue
+            new_entries[arcname] = file_path
+
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            existing_names = set(zip_ref.namelist())
+
+        # 第二步：根据is_repeat_skip参数处理已存在的文件
+        replace_names = new_entries.keys() & existing_names
+        if is_repeat_skip:
+            for arcname in replace_names:
+                logger.info(f"zip中已存在文件 {arcname}，已跳过")
+                del new_entries[arcname]
+            replace_names = set()
+
+        if not replace_names:
+            # 没有需要替换的文件，直接以追加模式写入
+            with zipfile.ZipFile(zip_path, "a") as zip_ref:
+                ZipUtils._write_entries(zip_ref, new_entries)
+            return
+
+        # 第三步：存在需要替换的文件，一次性重写zip，排除被替换的文件
+        temp_zip_path = zip_path + ".tmp"
+        try:
+            with zipfile.ZipFile(zip_path, "r") as zip_ref, zipfile.ZipFile(
+                temp_zip_path, "w"
+            ) as temp_zip:
+                temp_zip.comment = zip_ref.comment
+                for item in zip_ref.infolist():
+                    if item.filename in replace_names:
                         continue
-                    else:
-                        # 先删除已存在的文件
-                        try:
-                            # 创建临时zip，排除要删除的文件
-                            temp_zip_path = zip_path + ".tmp"
-                            with zipfile.ZipFile(temp_zip_path, "w") as temp_zip:
-                                for item in zip_ref.infolist():
-                                    if item.filename != arcname:
-                                        temp_zip.writestr(
-                                            item, zip_ref.read(item.filename)
-                                        )
-                            # 替换原zip
-                            zip_ref.close()
-                            os.replace(temp_zip_path, zip_path)
-                            # 重新打开zip文件以继续添加
-                            zip_ref = zipfile.ZipFile(zip_path, "a")
-                        except Exception as e:
-                            logger.error(
-                                f"删除zip中已存在文件 {arcname} 失败: {str(e)}"
-                            )
-                            raise
+                    ZipUtils._copy_entry(zip_ref, temp_zip, item)
+                ZipUtils._write_entries(temp_zip, new_entries)
+            # 替换原zip
+            os.replace(temp_zip_path, zip_path)
+        except Exception as e:
+            logger.error(
+                f"删除zip中已存在文件 {', '.join(sorted(replace_names))} 失败: {str(e)}"
+            )
+            if os.path.exists(temp_zip_path):
+                os.remove(temp_zip_path)
+            raise
 
-                try:
-                    # 将文件添加到zip中
-                    zip_ref.write(file_path, arcname)
-                    # logger.info(f"已将文件 {file_path} 添加到zip中，存储为 {arcname}")
-                except Exception as e:
-                    logger.error(f"添加文件 {file_path} 到zip失败: {str(e)}")
-                    raise
+    @staticmethod
+    def _copy_entry(src_zip, dst_zip, info):
+        """
+        将条目从 src_zip 复制到以写模式打开的 dst_zip
+
+        未加密的条目直接复制压缩后的原始数据，跳过解压和重新压缩；
+        加密条目或当前 Python 的 zipfile 内部实现不兼容时，回退为公开 API 的流式解压复制
+        """
+        if (
+            info.flag_bits & _FLAG_ENCRYPTED
+            or not _RAW_COPY_SUPPORTED
+            or not all(hasattr(dst_zip, name) for name in _RAW_COPY_ZIP_ATTRS)
+        ):
+            # 流式复制，避免将整个文件读入内存
+            with src_zip.open(info) as src, dst_zip.open(info, "w") as dst:
+                shutil.copyfileobj(src, dst, _COPY_BUFSIZE)
+            return
+
+        # 读取源条目的本地文件头，定位压缩数据的起始位置
+        src_fp = src_zip.fp
+        src_fp.seek(info.header_offset)
+        fheader = struct.unpack(
+            zipfile.structFileHeader, src_fp.read(zipfile.sizeFileHeader)
+        )
+        src_fp.seek(
+            fheader[zipfile._FH_FILENAME_LENGTH] + fheader[zipfile._FH_EXTRA_FIELD_LENGTH],
+            os.SEEK_CUR,
+        )
+
+        # 新本地文件头直接写入CRC和大小，不再需要数据描述符
+        zinfo = copy.copy(info)
+        zinfo.flag_bits &= ~_FLAG_DATA_DESCRIPTOR
+        zinfo.extra = zipfile._strip_extra(info.extra, (1,))
+        zip64 = max(zinfo.file_size, zinfo.compress_size) > zipfile.ZIP64_LIMIT
+
+        with dst_zip._lock:
+            dst_fp = dst_zip.fp
+            dst_fp.seek(dst_zip.start_dir)
+            zinfo.header_offset = dst_fp.tell()
+            dst_fp.write(zinfo.FileHeader(zip64))
+            remaining = info.compress_size
+            while remaining > 0:
+                chunk = src_fp.read(min(remaining, _COPY_BUFSIZE))
+                if not chunk:
+                    raise zipfile.BadZipFile(f"条目 {info.filename} 数据不完整")
+                dst_fp.write(chunk)
+                remaining -= len(chunk)
+            dst_zip.start_dir = dst_fp.tell()
+            dst_zip.filelist.append(zinfo)
+            dst_zip.NameToInfo[zinfo.filename] = zinfo
+            dst_zip._didModify = True
+
+    @staticmethod
+    def _write_entries(zip_ref, new_entries):
+        """将 {zip内路径: 文件路径} 中的文件写入已打开的zip"""
+        for arcname, file_path in new_entries.items():
+            try:
+                # 将文件添加到zip中
+                zip_ref.write(file_path, arcname)
+                # logger.info(f"已将文件 {file_path} 添加到zip中，存储为 {arcname}")
+            except Exception as e:
+                logger.error(f"添加文件 {file_path} 到zip失败: {str(e)}")
+                raise
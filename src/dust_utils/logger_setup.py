@@ -4,10 +4,31 @@ import os
 import sys
 from typing import Any
 import json
-from logging.handlers import RotatingFileHandler
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import wcwidth
 
 # 全局变量声明
 log_file = None
+# 后台写日志的监听器，重复调用 setup_logger 时先停止旧的
+_listener = None
+# 当前挂在根记录器上的队列处理器，重复调用 setup_logger 时先移除
+_queue_handler = None
+
+
+def _stop_listener():
+    """停止后台日志线程，写完队列中剩余的日志并关闭其处理器"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+# 进程退出时停止后台日志线程，只注册一次
+atexit.register(_stop_listener)
 
 # 定义SUCCESS日志级别
 SUCCESS = 25  # 在INFO(20)和WARNING(30)之间
@@ -40,6 +61,17 @@ class ColorFormatter(logging.Formatter):
         "CRITICAL": "#B71C1C",
     }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 预先计算各级别的 ANSI 颜色；自定义颜色首次使用时再加入缓存
+        self._ansi_cache = {
+            c: self._hex_to_ansi(c) for c in (*self.COLOR_CODES.values(), "#FFFFFF")
+        }
+        self._level_ansi = {
+            level: self._ansi_cache[c] for level, c in self.COLOR_CODES.items()
+        }
+        self._default_ansi = self._ansi_cache["#FFFFFF"]
+
     def _hex_to_ansi(self, hex_color):
         hex_color = hex_color.lstrip("#")
         r = int(hex_color[0:2], 16)
@@ -48,9 +80,13 @@ class ColorFormatter(logging.Formatter):
         return f"\033[38;2;{r};{g};{b}m"
 
     def format(self, record):
-        default_color = self.COLOR_CODES.get(record.levelname, "#FFFFFF")
-        color = getattr(record, "color", default_color)
-        ansi_color = self._hex_to_ansi(color)
+        color = getattr(record, "color", None)
+        if color is None:
+            ansi_color = self._level_ansi.get(record.levelname, self._default_ansi)
+        else:
+            ansi_color = self._ansi_cache.get(color)
+            if ansi_color is None:
+                ansi_color = self._ansi_cache[color] = self._hex_to_ansi(color)
         message = super().format(record)
         return f"{ansi_color}{message}\033[0m"
 
@@ -60,12 +96,16 @@ def safe_to_dict(
 ) -> Any:
     """
     把对象转成可序列化的 dict，支持嵌套、列表、循环引用检测
+    seen 只记录当前递归路径上的对象，进入时加入、返回时移除，整个遍历共用一个集合
     """
+    # 基础类型没有子节点，直接返回，省去循环引用检测
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+
     if seen is None:
         seen = set()
 
     obj_id = id(obj)
-    # print(f"对象：{obj}\t深度：{current_depth}")
     if obj_id in seen:
         return f"<循环引用: {type(obj).__name__}>"
 
@@ -73,26 +113,28 @@ def safe_to_dict(
         return f"<深度超出 {max_depth}>"
 
     seen.add(obj_id)
+    try:
+        if isinstance(obj, (list, tuple)):
+            return [safe_to_dict(x, seen, max_depth, current_depth + 1) for x in obj]
 
-    if isinstance(obj, (list, tuple)):
-        return [safe_to_dict(x, seen.copy(), max_depth, current_depth + 1) for x in obj]
-
-    if isinstance(obj, dict):
-        return {
-            k: safe_to_dict(v, seen.copy(), max_depth, current_depth + 1)
-            for k, v in obj.items()
-        }
+        if isinstance(obj, dict):
+            return {
+                k: safe_to_dict(v, seen, max_depth, current_depth + 1)
+                for k, v in obj.items()
+            }
 
-    if hasattr(obj, "__dict__") and not isinstance(obj, type):
-        d = {}
-        for k, v in vars(obj).items():
-            d[k] = safe_to_dict(v, seen.copy(), max_depth, current_depth + 1)
-        return {**d, "__class__": obj.__class__.__name__}
+        if hasattr(obj, "__dict__") and not isinstance(obj, type):
+            d = {}
+            for k, v in vars(obj).items():
+                d[k] = safe_to_dict(v, seen, max_depth, current_depth + 1)
+            return {**d, "__class__": obj.__class__.__name__}
 
-    if hasattr(obj, "_asdict"):  # dataclass / namedtuple
-        return safe_to_dict(obj._asdict(), seen.copy(), max_depth, current_depth + 1)
+        if hasattr(obj, "_asdict"):  # dataclass / namedtuple
+            return safe_to_dict(obj._asdict(), seen, max_depth, current_depth + 1)
 
-    return obj
+        return obj
+    finally:
+        seen.discard(obj_id)
 
 
 def logger_success(self, message, *args, **kwargs):
@@ -103,13 +145,15 @@ def logger_success(self, message, *args, **kwargs):
 
 def logger_divider(self, message="", max_len=50, char="=", *args, **kwargs):
     """记录 DIVIDER 分隔线日志"""
-    import wcwidth
-
     message = message.rstrip()
     if len(message) > 0:
         message = f" {message} "
 
-    msg_width = wcwidth.wcswidth(message)
+    # 纯 ASCII 可打印文本显示宽度等于长度，无需逐字符计算
+    if message.isascii() and message.isprintable():
+        msg_width = len(message)
+    else:
+        msg_width = wcwidth.wcswidth(message)
     if msg_width >= max_len:
         self.log(DIVIDER, message, *args, stacklevel=3, **kwargs)
         return
@@ -156,7 +200,7 @@ def setup_logger(
     :param max_log_file_size: 日志文件最大大小，默认 10MB
     :return: 配置好的 logger 实例
     """
-    global log_file
+    global log_file, _listener, _queue_handler
     timestamp = time.strftime("%Y%m%d_%H%M%S")
     if log_folder:
         if not os.path.isabs(log_folder):
@@ -180,18 +224,31 @@ def setup_logger(
         maxBytes=max_log_file_size,
         backupCount=1,
         encoding="utf-8",
+        delay=True,  # 首次写入时才打开文件
     )
     file_formatter = logging.Formatter(
         "%(asctime)s [%(levelname)-7s] [%(threadName)-10s] %(filename)s:%(lineno)d - %(message)s"
     )
     file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
     console_handler = logging.StreamHandler()
     color_formatter = ColorFormatter(
         "%(asctime)s [%(levelname)-7s] [%(threadName)-10s] %(message)s"
     )
     console_handler.setFormatter(color_formatter)
-    logger.addHandler(console_handler)
+
+    # 调用线程只把日志记录放入队列，格式化和磁盘/控制台输出由后台线程完成
+    # 重复调用时移除旧的队列处理器并停止旧线程，避免日志继续写入无人消费的队列
+    if _queue_handler is not None:
+        logger.removeHandler(_queue_handler)
+        _queue_handler = None
+    _stop_listener()
+    log_queue = queue.Queue(-1)
+    _listener = QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+    _queue_handler = QueueHandler(log_queue)
+    logger.addHandler(_queue_handler)
     disabled_loggers = [
         "requests",
         "urllib3",
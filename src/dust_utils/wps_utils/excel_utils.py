@@ -2,17 +2,137 @@ from .office_base import OfficeBase, auto_before_call
 from .office_utils import OfficeUtils
 
 import os
+import functools
+from concurrent.futures import ProcessPoolExecutor
 import logging
 from typing import List, Any
 from typing import overload  # 用于重载方法，根据参数类型选择不同的实现
 import re
-from datetime import datetime
+from datetime import datetime, time, timezone
 from typing import Optional
 
 import types
 
+try:
+    from openpyxl import load_workbook
+except ImportError:
+    load_workbook = None  # 未安装时只读也走 COM
+
 logger = logging.getLogger(__name__)
 
+# 可以直接用 openpyxl 读取的文件格式
+_OPENPYXL_EXTS = (".xlsx", ".xlsm")
+# 错误值在 COM 中以整数错误码返回
+_COM_ERROR_CODES = {
+    "#NULL!": -2146826288,
+    "#DIV/0!": -2146826281,
+    "#VALUE!": -2146826273,
+    "#REF!": -2146826265,
+    "#NAME?": -2146826259,
+    "#NUM!": -2146826252,
+    "#N/A": -2146826246,
+}
+# COM 中纯时间的日期部分
+_COM_EPOCH = datetime(1899, 12, 30)
+# 货币格式的单元格 COM 返回 Decimal，openpyxl 无法还原，遇到时改用 COM 读取
+_CURRENCY_MARKS = ("$", "¥", "￥", "€", "£")
+
+
+class _UseCom(Exception):
+    """openpyxl 读取结果无法与 COM 保持一致，改用 COM 读取"""
+
+
+def _com_value(cell):
+    """
+    将 openpyxl 只读单元格的值转换为 COM Range.Value 返回的形式：
+    数字为 float，错误值为错误码，日期时间带 UTC 时区，纯时间补上 1899-12-30
+    """
+    value = cell.value
+    if value is None or type(value) is str or type(value) is bool:
+        if cell.data_type == "e":
+            if value not in _COM_ERROR_CODES:
+                raise _UseCom(value)
+            return _COM_ERROR_CODES[value]
+        return value
+    if isinstance(value, (int, float)):
+        fmt = cell.number_format or ""
+        if any(mark in fmt for mark in _CURRENCY_MARKS):
+            raise _UseCom(fmt)
+        return float(value)
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=timezone.utc)
+    if isinstance(value, time):
+        return datetime.combine(_COM_EPOCH, value, tzinfo=timezone.utc)
+    # date、timedelta 等 COM 不会返回的类型
+    raise _UseCom(type(value).__name__)
+
+
+# 尚未读取的占位值，用于区分 COM 返回的 None
+_UNSET = object()
+
+# 并行复制工作表时的最大进程数，每个进程各自启动一个 Office 实例，
+# 过多会出现 RPC 服务器不可用
+COPY_SHEET_MAX_WORKERS = 5
+
+# 单元格坐标，如 A1、AB200
+_CELL_RE = re.compile(r"([A-Z]+)(\d+)")
+
+
+# 批量写入期间关闭的应用程序设置：屏幕刷新、事件。
+# 不切换为手动重算：方法内会调用 save，计算模式会随工作簿保存，
+# 重新打开后公式不再自动更新
+_FAST_MODE_SETTINGS = (
+    ("ScreenUpdating", False),
+    ("EnableEvents", False),
+)
+
+
+def _fast_mode(method):
+    """
+    方法装饰器：执行期间关闭屏幕刷新和事件，避免每次 COM 写入都触发重绘和事件处理，
+    结束后按相反顺序恢复原设置。WPS 不支持的属性直接跳过。
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        app = self.office
+        saved = []
+        for name, value in _FAST_MODE_SETTINGS:
+            try:
+                old = getattr(app, name)
+                if old != value:
+                    setattr(app, name, value)
+                    saved.append((name, old))
+            except Exception:
+                logger.debug(f"应用程序不支持设置 {name}，跳过")
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            for name, old in reversed(saved):
+                try:
+                    setattr(app, name, old)
+                except Exception as e:
+                    logger.warning(f"恢复应用程序设置 {name} 失败: {e}")
+
+    return wrapper
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_cell(cell_ref: str) -> Optional[tuple[int, int]]:
+    """
+    将大写的单元格坐标解析为 (行号, 列号)，格式错误时返回 None。
+    同一批坐标会被反复解析，按坐标缓存结果。
+    """
+    m = _CELL_RE.match(cell_ref)
+    if not m:
+        return None
+    col_part, row_part = m.groups()
+    # 列字母转数字（A->1, B->2, ..., Z->26, AA->27...），遍历 bytes 直接得到字符编码
+    col = 0
+    for b in col_part.encode():
+        col = col * 26 + (b - 64)
+    return int(row_part), col
+
 
 @auto_before_call(before_func="available")
 class ExcelUtils(OfficeBase):
@@ -22,6 +142,7 @@ class ExcelUtils(OfficeBase):
         family_name: str = None,
         use_wps: bool = True,
         is_debug: bool = False,
+        new_instance: bool = False,
     ):
         """
         初始化 ExcelUtils 类，打开指定 Excel 文件。
@@ -31,12 +152,17 @@ class ExcelUtils(OfficeBase):
         - family_name: str = "微软雅黑", 如果是创建文件，则生效
         - use_wps: bool = True, True 表示使用 WPS Office，False 表示使用 Excel
         - is_debug: bool = False, 是否进入调试模式
+        - new_instance: bool = False, 是否启动独立的 Office 进程，不复用已有实例
         """
         # 确定使用 WPS 还是 Excel
         prog_id = "Ket.Application" if use_wps else "Excel.Application"
         # 设置 logger 级别
         logger.setLevel(logging.DEBUG if is_debug else logging.INFO)
-        super().__init__(file_path, prog_id, is_debug)
+        super().__init__(file_path, prog_id, is_debug, new_instance)
+        self.use_wps = use_wps
+        # 工作表名称列表和工作表包装对象的缓存，增删工作表或切换工作簿时清空
+        self._sheet_names_cache = None
+        self._sheet_cache = {}
         try:
             self.family_name = family_name
             self.border_color = 0x16B777
@@ -54,6 +180,11 @@ class ExcelUtils(OfficeBase):
 
     # region 工作簿操作
 
+    def __reset_sheet_cache(self):
+        """清空工作表缓存，在增删工作表或切换工作簿后调用"""
+        self._sheet_names_cache = None
+        self._sheet_cache = {}
+
     def get_sheet_names(self) -> list[str]:
         """
         获取工作簿中所有工作簿的名称列表。
@@ -61,11 +192,16 @@ class ExcelUtils(OfficeBase):
         返回:
         - list: 工作簿名称列表
         """
-        sheet_names = []
-        if self.excel:
-            sheet_names = [ws.Name for ws in self.excel.Worksheets]
-        logger.debug(f"工作簿 {self.file_path} 中的工作表名称: {sheet_names}")
-        return sheet_names
+        if self._sheet_names_cache is None:
+            if not self.excel:
+                return []
+            # 遍历 Worksheets 集合需要多次 COM 调用，结果缓存到工作表发生增删为止
+            self._sheet_names_cache = [ws.Name for ws in self.excel.Worksheets]
+            logger.debug(
+                f"工作簿 {self.file_path} 中的工作表名称: {self._sheet_names_cache}"
+            )
+        # 返回副本，避免调用方修改缓存
+        return list(self._sheet_names_cache)
 
     def get_sheet(self, sheet_name: str) -> "WorksheetWrapper":
         """
@@ -77,9 +213,14 @@ class ExcelUtils(OfficeBase):
         返回:
         - WorksheetWrapper: 包装的工作簿对象
         """
+        wrapper = self._sheet_cache.get(sheet_name)
+        if wrapper is not None:
+            return wrapper
         try:
             ws = self.excel.Worksheets(sheet_name)
-            return WorksheetWrapper(ws)
+            wrapper = WorksheetWrapper(ws)
+            self._sheet_cache[sheet_name] = wrapper
+            return wrapper
         except Exception:
             logger.error(f"工作表 {sheet_name} 不存在")
             raise RuntimeError(f"工作表 {sheet_name} 不存在")
@@ -103,8 +244,12 @@ class ExcelUtils(OfficeBase):
         返回:
         - list of list: 二维列表，包含所有单元格的值
         """
-        ws = self.get_sheet(sheet_name)
-        values = ws.get_UsedRange_value(is_value=is_value)
+        values = None
+        if is_value:
+            values = self.__read_sheet_values_fast(sheet_name)
+        if values is None:
+            ws = self.get_sheet(sheet_name)
+            values = ws.get_UsedRange_value(is_value=is_value)
 
         # 应用 skip_row_count 跳过指定行数
         if skip_row_count > 0 and skip_row_count < len(values):
@@ -121,6 +266,42 @@ class ExcelUtils(OfficeBase):
         logger.debug(f"工作表 {sheet_name} 的所有单元格值: {values}")
         return values
 
+    def __read_sheet_values_fast(self, sheet_name: str) -> Optional[list]:
+        """
+        不经过 COM，直接用 openpyxl 流式读取磁盘上 xlsx 已使用区域的值，
+        结果与 COM 读取一致。
+        未安装 openpyxl、文件格式不支持、工作簿有未保存的修改
+        （含通过 COM 对象直接做的修改）、存在无法还原为 COM 形式的单元格
+        或读取失败时返回 None，由调用方走 COM。
+        """
+        if load_workbook is None or not self.file_path.lower().endswith(_OPENPYXL_EXTS):
+            return None
+        try:
+            # Saved 由 Excel 维护，能反映任何途径的修改；同时确认磁盘文件就是当前工作簿
+            if not self.excel.Saved or os.path.normcase(
+                self.excel.FullName
+            ) != os.path.normcase(self.file_path):
+                return None
+            wb = load_workbook(self.file_path, read_only=True, data_only=True)
+            try:
+                ws = wb[sheet_name]
+                # 与 UsedRange 一致，从已使用区域的左上角开始读取
+                rows = ws.iter_rows(min_row=ws.min_row, min_col=ws.min_column)
+                # COM 返回的每行为 tuple
+                values = [tuple(_com_value(cell) for cell in row) for row in rows]
+            finally:
+                wb.close()
+        except _UseCom as e:
+            logger.debug(
+                f"工作表 {sheet_name} 含 openpyxl 无法还原的值 {e}，改用 COM 读取"
+            )
+            return None
+        except Exception as e:
+            logger.debug(f"openpyxl 读取工作表 {sheet_name} 失败，改用 COM 读取: {e}")
+            return None
+        return _trim_trailing_empty(values or [()])
+
+    @_fast_mode
     def copy_sheet(
         self, src_sheet_name: str, target_path: str, target_sheet_name: str
     ) -> None:
@@ -139,6 +320,9 @@ class ExcelUtils(OfficeBase):
         """
         target_path = os.path.normpath(os.path.abspath(target_path))
         wb_dest = None
+        # 目标为当前工作簿时工作表会发生变化
+        if os.path.normcase(target_path) == os.path.normcase(self.file_path):
+            self.__reset_sheet_cache()
 
         try:
             # 检查源工作簿是否存在
@@ -170,7 +354,7 @@ class ExcelUtils(OfficeBase):
             except:
                 logger.debug(f"目标工作簿中不存在 {target_sheet_name}，无需删除")
 
-            # 复制源工作簿到目标工作簿
+            # 复制源工作簿到目标工作簿，Worksheet.Copy 会一并复制其中的形状、图表和图片
             logger.debug(f"复制工作簿 {src_sheet_name} 到目标工作簿")
             ws_src.Copy(
                 Before=wb_dest.Worksheets(1) if wb_dest.Worksheets.Count > 0 else None
@@ -183,34 +367,6 @@ class ExcelUtils(OfficeBase):
                 f"工作簿复制成功：{target_sheet_name}",
             )
 
-            # 复制形状和图表
-            try:
-                for shape in ws_src.Shapes:
-                    logger.debug(
-                        f"工作簿 {target_sheet_name} 复制形状：{shape.Name} (类型：{shape.Type})",
-                    )
-                    shape.Copy()
-                    new_ws.Paste()
-                    new_shape = new_ws.Shapes(new_ws.Shapes.Count)
-                    new_shape.Left = shape.Left
-                    new_shape.Top = shape.Top
-                    logger.debug("形状 %s 已复制并定位", shape.Name)
-
-                for chart in ws_src.ChartObjects():
-                    logger.debug(
-                        f"工作簿 {target_sheet_name} 复制图表：{chart.Name}",
-                    )
-                    chart.Copy()
-                    new_ws.Paste()
-                    new_chart = new_ws.ChartObjects(new_ws.ChartObjects.Count)
-                    new_chart.Left = chart.Left
-                    new_chart.Top = chart.Top
-                    logger.debug("图表 %s 已复制并定位", chart.Name)
-            except Exception as e:
-                logger.warning(
-                    f"工作簿 {target_sheet_name} 复制图表时出错: {str(e)}，继续执行",
-                )
-
             # 保存并关闭目标工作簿
             wb_dest.Save()
             wb_dest.Close()
@@ -235,6 +391,65 @@ class ExcelUtils(OfficeBase):
                 except:
                     pass
 
+    def copy_sheet_many(
+        self, src_sheet_name: str, targets: list[tuple[str, str]]
+    ) -> None:
+        """
+        将指定工作簿并行复制到多个目标文件中。
+        - 每个子进程通过 DispatchEx 启动独立的 Office 实例执行 copy_sheet，
+          退出时只关闭自己的实例，不影响当前实例和其他进程。
+        - 同一目标文件的任务在同一进程中依次执行，避免同时写入同一文件。
+        - 当前工作簿有未保存的修改时先保存，子进程从磁盘读取源文件。
+        - Windows 下使用多进程，调用方需放在 if __name__ == "__main__": 中执行。
+
+        参数:
+        - src_sheet_name: str, 源工作簿名
+        - targets: list[tuple[str, str]], (目标文件路径, 目标工作簿名) 列表
+
+        异常:
+        - 任一目标复制失败时，在全部任务结束后抛出 RuntimeError。
+        """
+        if not targets:
+            return
+        if not self.excel.Saved:
+            self.save()
+
+        # 按目标文件分组
+        jobs = {}
+        for target_path, target_sheet_name in targets:
+            target_path = os.path.normpath(os.path.abspath(target_path))
+            jobs.setdefault(target_path, []).append(target_sheet_name)
+
+        errors = []
+        max_workers = min(COPY_SHEET_MAX_WORKERS, len(jobs))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                target_path: executor.submit(
+                    _copy_sheet_worker,
+                    self.file_path,
+                    src_sheet_name,
+                    target_path,
+                    target_sheet_names,
+                    self.use_wps,
+                )
+                for target_path, target_sheet_names in jobs.items()
+            }
+            for target_path, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(
+                        f"复制工作簿 {src_sheet_name} 到 {target_path} 失败: {e}"
+                    )
+                    errors.append(f"{target_path}: {e}")
+
+        if errors:
+            raise RuntimeError(
+                f"复制工作簿 {src_sheet_name} 失败 {len(errors)} 个："
+                + "；".join(errors)
+            )
+        logger.info(f"工作簿 {src_sheet_name} 已复制到 {len(jobs)} 个文件")
+
     def remove_sheet(self, sheet_name: str):
         """
         删除指定工作簿。
@@ -253,6 +468,7 @@ class ExcelUtils(OfficeBase):
         try:
             ws_to_delete = self.excel.Worksheets(sheet_name)
             ws_to_delete.Delete()
+            self.__reset_sheet_cache()
             self.excel.Save()  # 保存更改
             logger.info(f"工作簿删除成功：{sheet_name}")
         except:
@@ -275,6 +491,7 @@ class ExcelUtils(OfficeBase):
 
         new_sheet = self.excel.Worksheets.Add()
         new_sheet.Name = sheet_name
+        self.__reset_sheet_cache()
         self.excel.Save()
         logger.debug(f"成功创建新工作表：{sheet_name}")
 
@@ -367,6 +584,7 @@ class ExcelUtils(OfficeBase):
         else:
             return sheet.get_cell_value(cell_ref=cell_ref, is_value=is_value)
 
+    @_fast_mode
     def set_cell_value(
         self,
         sheet_name: str,
@@ -409,6 +627,7 @@ class ExcelUtils(OfficeBase):
         if auto_save:
             self.save()
 
+    @_fast_mode
     def set_merge_cell(
         self,
         sheet_name: str,
@@ -449,6 +668,7 @@ class ExcelUtils(OfficeBase):
             f"合并单元格 {sheet_name}!{start_cell}:{end_cell} 并写入值: {value}"
         )
 
+    @_fast_mode
     def set_range_values(
         self,
         sheet_name: str,
@@ -476,6 +696,9 @@ class ExcelUtils(OfficeBase):
             self.create_sheet(sheet_name=sheet_name)
 
         ws = self.get_sheet(sheet_name)
+
+        # 规范二维数组每行长度一致，区域按最长的一行计算
+        data = OfficeUtils.normalize_row_lengths(data)
         rows, cols = len(data), len(data[0])
 
         # 计算结束单元格
@@ -484,9 +707,6 @@ class ExcelUtils(OfficeBase):
         # 获取目标区域
         target_range = ws.worksheet.Range(f"{start_cell}:{end_cell}")
 
-        # 规范二维数组每行长度一致
-        data = OfficeUtils.normalize_row_lengths(data)
-
         # 一次性写入数据
         target_range.Value = data
         logger.debug(
@@ -497,38 +717,53 @@ class ExcelUtils(OfficeBase):
         if self.family_name:
             target_range.Font.Name = self.family_name
 
-        # 遍历数据，若单元格值以=开头，则设置绿色边框
-        start_row_letter, start_row_num = self.cell_to_row_col(start_cell)
-        start_row = int(start_row_num)
-        start_col = 0
-        for ch in start_row_letter:
-            start_col = start_col * 26 + (ord(ch) - ord("A") + 1)
+        # 先在 Python 侧算出每个单元格的数字格式和需要加边框的公式单元格，
+        # 再按格式分组批量设置，避免逐个单元格跨进程调用 COM
+        start_row, start_col = _parse_cell(start_cell.upper())
+        format_cells = {}
+        border_cells = []
         for r_idx, row in enumerate(data):
+            r = start_row + r_idx
             for c_idx, cell_value in enumerate(row):
-                cell = ws.worksheet.Cells(start_row + r_idx, start_col + c_idx)
+                c = start_col + c_idx
                 # 设置数字格式
                 if number_format and (
                     isinstance(cell_value, (int, float)) or cell_value.startswith("=")
                 ):
-                    cell.NumberFormat = number_format
+                    fmt = number_format
                 else:
                     # 默认文本格式
-                    cell.NumberFormat = "@"
+                    fmt = "@"
 
                 # 判断是否为字符串
                 if isinstance(cell_value, str):
                     # 如果是公式，添加边框，突出显示
                     if cell_value.startswith("="):
-                        cell.Borders.Color = self.border_color
+                        border_cells.append((r, c))
                     # 如果是日期，作为文本显示
                     is_date, date_format = OfficeUtils.get_date_format(cell_value)
                     if is_date:
-                        cell.NumberFormat = date_format
+                        fmt = date_format
+                format_cells.setdefault(fmt, []).append((r, c))
+
+        # 最常见的格式直接设置到整个区域，其余格式按合并后的地址串批量覆盖
+        main_format = None
+        if format_cells:
+            main_format = max(format_cells, key=lambda f: len(format_cells[f]))
+            target_range.NumberFormat = main_format
+        for fmt, cells in format_cells.items():
+            if fmt == main_format:
+                continue
+            for address in self.__cells_to_addresses(cells):
+                ws.worksheet.Range(address).NumberFormat = fmt
+        for address in self.__cells_to_addresses(border_cells):
+            ws.worksheet.Range(address).Borders.Color = self.border_color
 
         # 自动保存
         if auto_save:
             self.save()
 
+    @_fast_mode
     def set_range_color(
         self,
         sheet_name: str,
@@ -566,6 +801,7 @@ class ExcelUtils(OfficeBase):
         if auto_save:
             self.save()
 
+    @_fast_mode
     def add_annotation(
         self,
         sheet_name: str,
@@ -590,6 +826,7 @@ class ExcelUtils(OfficeBase):
             f"工作表 {sheet_name} 单元格 {cell_ref} 添加批注：{annotation} (作者：{author})"
         )
 
+    @_fast_mode
     def set_conditional_format(
         self,
         sheet_name: str,
@@ -704,6 +941,47 @@ class ExcelUtils(OfficeBase):
             return f'"{value}"'
         return str(value)
 
+    @staticmethod
+    def __cells_to_addresses(cells: list[tuple[int, int]]) -> list[str]:
+        """
+        将按行优先顺序排列的 (行, 列) 单元格合并为矩形区域，拼成逗号分隔的地址串。
+        每个地址串不超过 Excel 的 255 字符限制，设置一次属性只需一次 COM 调用。
+        """
+        # 先合并同一行内连续的列
+        runs = []
+        for r, c in cells:
+            if runs and runs[-1][0] == r and runs[-1][2] == c - 1:
+                runs[-1][2] = c
+            else:
+                runs.append([r, c, c])
+
+        # 再合并上下相邻且列跨度相同的行段
+        open_blocks = {}
+        blocks = []
+        for r, c0, c1 in runs:
+            block = open_blocks.get((c0, c1))
+            if block is not None and block[1] == r - 1:
+                block[1] = r
+            else:
+                block = [r, r, c0, c1]
+                open_blocks[(c0, c1)] = block
+                blocks.append(block)
+
+        addresses = []
+        current = ""
+        for r0, r1, c0, c1 in blocks:
+            ref = f"{ExcelUtils.col_num_to_letter(c0)}{r0}"
+            if r0 != r1 or c0 != c1:
+                ref += f":{ExcelUtils.col_num_to_letter(c1)}{r1}"
+            if current and len(current) + 1 + len(ref) > 255:
+                addresses.append(current)
+                current = ref
+            else:
+                current = f"{current},{ref}" if current else ref
+        if current:
+            addresses.append(current)
+        return addresses
+
     @staticmethod
     def __build_formula2(condition_type: str, value: Any) -> Optional[str]:
         return str(value[1]) if condition_type == "between" else None
@@ -735,17 +1013,11 @@ class ExcelUtils(OfficeBase):
         if data is None or not data:
             data = [[]]
 
-        # 使用正则提取起始列字母与行号
-        m = re.match(r"([A-Z]+)(\d+)", start_cell.upper())
-        if not m:
+        # 解析起始行号与列号
+        parsed = _parse_cell(start_cell.upper())
+        if parsed is None:
             raise ValueError("起始单元格格式错误，应为如 A1 的格式")
-        col_part, row_part = m.groups()
-        start_row = int(row_part)
-
-        # 列字母转数字（A->1, B->2, ..., Z->26, AA->27...）
-        start_col = 0
-        for ch in col_part:
-            start_col = start_col * 26 + (ord(ch) - ord("A") + 1)
+        start_row, start_col = parsed
 
         # 计算结束行列
         end_row = start_row + max(len(data) - 1, 0) + add_row_count
@@ -766,16 +1038,12 @@ class ExcelUtils(OfficeBase):
         返回:
         - tuple[int, int]: (行号, 列号)
         """
-        m = re.match(r"([A-Z]+)(\d+)", cell_ref.upper())
-        if not m:
+        parsed = _parse_cell(cell_ref.upper())
+        if parsed is None:
             raise ValueError("单元格格式错误，应为如 A1 的格式")
-        col_part, row_part = m.groups()
-        row = int(row_part)
-        col = 0
-        for ch in col_part:
-            col = col * 26 + (ord(ch) - ord("A") + 1)
-        return row, col
+        return parsed
 
+    @_fast_mode
     def auto_adjust_columns(
         self,
         sheet_name: str,
@@ -824,6 +1092,7 @@ class ExcelUtils(OfficeBase):
         self.save()
 
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def col_num_to_letter(n: int) -> str:
         """
         将列号（1 基）转换为 Excel 列字母（如 1 -> A，28 -> AB）
@@ -852,7 +1121,7 @@ class ExcelUtils(OfficeBase):
         - tuple[str, str]: (列字母, 行号)
         """
         cell_ref = cell_ref.upper()
-        match = re.match(r"([A-Z]+)(\d+)", cell_ref)
+        match = _CELL_RE.match(cell_ref)
         if not match:
             raise ValueError(f"单元格坐标格式错误: {cell_ref}")
 
@@ -871,6 +1140,7 @@ class ExcelUtils(OfficeBase):
             logger.warning(f"Excel COM 对象不可用，准备重新创建: {e}")
             # 释放旧对象
             self.excel = None
+            self.__reset_sheet_cache()
             # 重新打开工作簿
             try:
                 self.excel = self.office.Workbooks.Open(self.file_path)
@@ -907,19 +1177,15 @@ class ExcelUtils(OfficeBase):
             logger.debug(f"已创建保存目录：{save_dir}")
 
         try:
-            self.excel.SaveAs(save_path)
-            if is_transfer:
-                self.excel = self.office.Workbooks.Open(save_path)
-                self.file_path = save_path
-                logger.debug(f"当前处理工作簿更新为：{save_path}")
-        except Exception as e:
-            logger.error(f"保存Excel失败 {save_path}: {str(e)}")
-            raise RuntimeError(f"保存Excel失败 {save_path}: {str(e)}")
-        try:
-            self.excel.SaveAs(save_path)
+            # 保存到当前文件时用 Save，无需 SaveAs 重新处理路径和文件格式
+            if save_path == self.file_path and os.path.exists(save_path):
+                self.excel.Save()
+            else:
+                self.excel.SaveAs(save_path)
             if is_transfer:
                 self.excel = self.office.Workbooks.Open(save_path)
                 self.file_path = save_path
+                self.__reset_sheet_cache()
                 logger.debug(f"当前处理工作簿更新为：{save_path}")
         except Exception as e:
             logger.error(f"保存Excel失败 {save_path}: {str(e)}")
@@ -940,11 +1206,74 @@ class ExcelUtils(OfficeBase):
                 logger.warning(f"工作簿 {self.file_path} 可能已关闭或无效")
             finally:
                 self.excel = None
+                self.__reset_sheet_cache()
         self.quit()
 
     # endregion
 
 
+# 不可能为空白的常见单元格值类型，无需转成字符串判断
+_NON_BLANK_TYPES = (int, float, bool, datetime)
+
+
+def _is_blank(value) -> bool:
+    """判断单元格值是否为 None、空字符串或仅含空格"""
+    if value is None:
+        return True
+    if type(value) is str:
+        return not value.strip()
+    if isinstance(value, _NON_BLANK_TYPES):
+        return False
+    return str(value).strip() == ""
+
+
+def _copy_sheet_worker(
+    src_file: str,
+    src_sheet_name: str,
+    target_path: str,
+    target_sheet_names: list[str],
+    use_wps: bool,
+) -> None:
+    """
+    copy_sheet_many 的子进程任务：启动独立的 Office 实例，
+    依次复制到同一目标文件的各工作簿，完成后退出该实例
+    """
+    excel = ExcelUtils(src_file, use_wps=use_wps, new_instance=True)
+    try:
+        for target_sheet_name in target_sheet_names:
+            excel.copy_sheet(src_sheet_name, target_path, target_sheet_name)
+    finally:
+        excel.close()
+
+
+def _trim_trailing_empty(values: list) -> list:
+    """
+    去掉二维数据末尾全为 None、空字符串或仅含空格的列和行。
+
+    参数:
+    - values: list, 二维数据，每行为 list 或 tuple
+
+    返回:
+    - list: 去除末尾空列、空行后的二维列表
+    """
+    # 每行从右往左找到最后一个非空单元格，一次遍历同时得到保留的列数和行数，
+    # 不再对每一列重新遍历全部行，也不为数字等非字符串值创建临时字符串
+    last_col = 0
+    last_row = 0
+    for r_idx, row in enumerate(values):
+        for c_idx in range(len(row) - 1, -1, -1):
+            value = row[c_idx]
+            # None 和空字符串最常见，先内联判断省去函数调用
+            if value is None or value == "":
+                continue
+            if not _is_blank(value):
+                last_row = r_idx + 1
+                if c_idx >= last_col:
+                    last_col = c_idx + 1
+                break
+    return [row[:last_col] for row in values[:last_row]]
+
+
 class WorksheetWrapper:
     def __init__(self, worksheet):
         """
@@ -977,24 +1306,7 @@ class WorksheetWrapper:
         if not isinstance(values[0], (list, tuple)):
             values = [list(values)]
 
-        # 去掉末尾全 None、空字符串或仅含空格的列
-        if values:
-            max_col = len(values[0])
-            for col_idx in reversed(range(max_col)):
-                if all(
-                    row[col_idx] is None or str(row[col_idx]).strip() == ""
-                    for row in values
-                ):
-                    max_col -= 1
-                else:
-                    break
-            values = [row[:max_col] for row in values]
-
-        # 去掉末尾全 None、空字符串或仅含空格的行
-        while values and all(
-            cell is None or str(cell).strip() == "" for cell in values[-1]
-        ):
-            values.pop()
+        values = _trim_trailing_empty(values)
 
         logger.debug(f"获取已使用范围值：{values}")
         return values
@@ -1108,6 +1420,8 @@ class WorksheetWrapper:
             # 将外层元组转为列表，避免后续赋值时报错
             data = [list(row) for row in data]
 
+        # 区域的统一格式，首次遇到日期时才读取；各单元格格式不一致时 COM 返回 None
+        range_fmt = _UNSET
         # 将None、纯空格处理为空字符串
         for i in range(len(data)):
             for j in range(len(data[i])):
@@ -1115,9 +1429,14 @@ class WorksheetWrapper:
                 if value is None or (isinstance(value, str) and value.strip() == ""):
                     data[i][j] = ""
                 elif isinstance(value, datetime):
-                    # 获取对应单元格的自定义格式
-                    cell = self.worksheet.Cells(rng.Row + i, rng.Column + j)
-                    fmt = cell.NumberFormatLocal
+                    # 整个区域格式一致时只需一次 COM 调用，否则再逐个获取单元格的自定义格式
+                    if range_fmt is _UNSET:
+                        range_fmt = rng.NumberFormatLocal
+                    if isinstance(range_fmt, str):
+                        fmt = range_fmt
+                    else:
+                        cell = self.worksheet.Cells(rng.Row + i, rng.Column + j)
+                        fmt = cell.NumberFormatLocal
                     try:
                         # 用 Excel 的格式字符串将 datetime 转为 str
                         data[i][j] = value.strftime(
@@ -1,12 +1,24 @@
 import os
+import functools
 import logging
 import re
-import win32com.client as win32
-import pythoncom
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def _ensure_win32():
+    """首次调用时导入 pywin32 的 win32com.client 和 pythoncom"""
+    try:
+        import win32com.client as win32
+        import pythoncom
+    except ImportError:
+        raise ImportError(
+            "该功能需要 pywin32（仅支持 Windows），请执行：pip install pywin32"
+        )
+    return win32, pythoncom
+
+
 def auto_before_call(before_func, skip_names=None):
     """
     类装饰器：为类中所有非私有“实例方法”自动加上调用指定前置方法的逻辑。
@@ -15,6 +27,9 @@ def auto_before_call(before_func, skip_names=None):
     参数：
         before_func: str, 前置方法名（例如 "check"、"ensure_ready"）
         skip_names: set[str]，可选，跳过的函数名集合
+
+    异常：
+        TypeError: 被装饰的类中不存在可调用的前置方法
     """
 
     def decorator(cls):
@@ -23,21 +38,33 @@ def auto_before_call(before_func, skip_names=None):
         else:
             skips = set(skip_names) | {before_func}
 
+        if not callable(getattr(cls, before_func, None)):
+            raise TypeError(f"类 {cls.__name__} 缺少前置方法 {before_func}")
+
+        # 按实际类型解析前置方法并按类缓存，子类重写的前置方法同样生效
+        hooks = {}
+
+        def call_before(self):
+            klass = type(self)
+            before = hooks.get(klass)
+            if before is None:
+                before = hooks[klass] = getattr(klass, before_func)
+            before(self)
+
         for name, method in list(cls.__dict__.items()):
-            # 仅处理可调用、非私有、不在跳过名单中的实例方法
+            # 仅处理可调用、非私有、不在跳过名单中的实例方法；
+            # 私有方法只在已包装的公开方法内部调用，其中 __xxx 经名称改写后为 _Cls__xxx
             if (
                 callable(method)
-                and not name.startswith("__")
+                and not name.startswith("_")
                 and name not in skips
                 and not isinstance(method, (staticmethod, classmethod))
             ):
 
                 def make_wrapper(m=method):
+                    @functools.wraps(m)
                     def wrapper(self, *args, **kwargs):
-                        # 获取前置函数
-                        before = getattr(self, before_func, None)
-                        if callable(before):
-                            before()
+                        call_before(self)
                         return m(self, *args, **kwargs)
 
                     return wrapper
@@ -50,21 +77,32 @@ def auto_before_call(before_func, skip_names=None):
 
 
 class OfficeBase:
-    def __init__(self, file_path: str, prog_id: str, is_debug: bool = False):
+    def __init__(
+        self,
+        file_path: str,
+        prog_id: str,
+        is_debug: bool = False,
+        new_instance: bool = False,
+    ):
         """
         初始化 OfficeBase 类，启动指定的 office 应用程序。
 
         参数:
         - file_path: str, Office 文件路径
         - prog_id: str, 要启动的应用程序 ID，例如 "Ket.Application" 或 "Excel.Application"
+        - new_instance: bool = False, True 时用 DispatchEx 启动独立的应用程序进程，
+          否则复用已在运行的实例
         """
+        # 先置空，导入失败时 __del__ 也能正常执行
+        self.office = None
+        win32, pythoncom = _ensure_win32()
         # 初始化 COM 库，确保在多线程环境下正常工作
         pythoncom.CoInitialize()
-        self.office = None
         # 设置 logger 级别
         logger.setLevel(logging.DEBUG if is_debug else logging.INFO)
         try:
-            self.office = win32.Dispatch(prog_id)
+            dispatch = win32.DispatchEx if new_instance else win32.Dispatch
+            self.office = dispatch(prog_id)
             self.office.Visible = False  # 是否展示窗口，调试时可改为 True
             self.office.DisplayAlerts = False  # 关闭警报弹窗
             self.file_path = os.path.normpath(os.path.abspath(file_path))
@@ -93,5 +131,5 @@ class OfficeBase:
             logger.error("关闭Office时出错: %s", str(e))
         finally:
             self.office = None
-            pythoncom.CoUninitialize()  # 释放 COM 库资源
+            _ensure_win32()[1].CoUninitialize()  # 释放 COM 库资源
             logger.info("Office资源已释放")
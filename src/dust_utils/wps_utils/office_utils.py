@@ -1,181 +1,444 @@
 import re
+import binascii
+import sys
+import functools
+import itertools
 from datetime import datetime
 from typing import List, Any
 import logging
 
+try:
+    from ciso8601 import parse_datetime as _parse_iso
+except ImportError:
+    _parse_iso = datetime.fromisoformat  # 未安装时使用标准库
+
 logger = logging.getLogger(__name__)
 
+# 本模块的函数都是逐个单元格调用的短字符串处理，numba 的 nopython 模式不支持
+# 这类 str/datetime 操作，退回 object 模式反而更慢，且首次调用要付出 JIT 编译时间。
+# 这里的优化依赖预编译正则、str.translate、lru_cache 等 C 层实现，不要加 @njit。
 
-class OfficeUtils:
+# 中文日期（年/月/日/时/分/秒）
+_ZH_DATE_RE = re.compile(
+    r"^\s*(\d{2,4})年(\d{1,2})月(\d{1,2})日"
+    r"(\s*(\d{1,2})[时:：](\d{1,2})([分:：](\d{1,2})秒?)?)?\s*$"
+)
+# ISO8601 格式（含Z或时区）
+_ISO_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(Z|[+-]\d{2}:?\d{2})?$")
+# 是否包含数字
+_HAS_DIGIT_RE = re.compile(r"\d")
+# 数字后的英文序数词后缀，只去掉后缀，避免误伤 August 等单词
+_ORDINAL_RE = re.compile(r"\b(\d+)(?:st|nd|rd|th)\b", re.IGNORECASE)
+# Excel 日期格式标记 -> strftime 格式
+_EXCEL_TOKENS = {
+    "yyyy": "%Y",
+    "yy": "%y",
+    "mmmm": "%B",
+    "mmm": "%b",
+    "mm": "%m",
+    "m": "%m",
+    "dddd": "%A",
+    "ddd": "%a",
+    "dd": "%d",
+    "d": "%d",
+    "hh": "%H",
+    "h": "%H",
+    "nn": "%M",  # Excel 中 n 表示分钟
+    "ss": "%S",
+}
+# 按长度从长到短排列，保证优先匹配最长标记
+_EXCEL_TOKEN_RE = re.compile(
+    "|".join(sorted(_EXCEL_TOKENS, key=len, reverse=True))
+)
+
+
+def _excel_token_repl(match):
+    return _EXCEL_TOKENS[match.group(0)]
+
+
+# strptime 指令对应的宽松预筛正则，只用于排除不可能匹配的格式，
+# 能被 strptime 解析的字符串一定能通过预筛，实际校验仍由 strptime 完成
+_STRPTIME_PREFILTER = {
+    "Y": r"\d{4}",
+    "m": r"\d{1,2}",
+    "d": r" ?\d{1,2}",
+    "H": r"\d{1,2}",
+    "M": r"\d{1,2}",
+    "S": r"\d{1,2}",
+    "b": r"[^\W\d_]+",
+    "B": r"[^\W\d_]+",
+    "z": r"(?:Z|[+-][\d:.]+)",
+}
+# strptime 指令可匹配的字符数范围，None 表示不限上限
+_STRPTIME_WIDTH = {
+    "Y": (4, 4),
+    "m": (1, 2),
+    "d": (1, 2),
+    "H": (1, 2),
+    "M": (1, 2),
+    "S": (1, 2),
+    "b": (1, None),
+    "B": (1, None),
+    "z": (1, None),
+}
+
+
+def _strptime_length_range(fmt):
+    """
+    计算 strptime 格式可匹配的字符串长度范围 (最短, 最长)，无上限时最长为 sys.maxsize
+    """
+    min_len = max_len = 0
+    i = 0
+    while i < len(fmt):
+        if fmt[i] == "%":
+            lo, hi = _STRPTIME_WIDTH[fmt[i + 1]]
+            i += 2
+        elif fmt[i].isspace():
+            lo, hi = 1, None
+            i += 1
+        else:
+            lo, hi = 1, 1
+            i += 1
+        min_len += lo
+        max_len = sys.maxsize if hi is None else min(max_len + hi, sys.maxsize)
+    return min_len, max_len
+
+
+def _strptime_prefilter(fmt):
+    """
+    将 strptime 格式转换为宽松的预筛正则，格式中的空白与 strptime 一致匹配任意空白
+    """
+    parts = []
+    i = 0
+    while i < len(fmt):
+        if fmt[i] == "%":
+            parts.append(_STRPTIME_PREFILTER[fmt[i + 1]])
+            i += 2
+        elif fmt[i].isspace():
+            parts.append(r"\s+")
+            i += 1
+        else:
+            parts.append(re.escape(fmt[i]))
+            i += 1
+    return re.compile("".join(parts) + r"\Z", re.IGNORECASE)
+
+
+# 常见日期格式（按优先顺序）：(最短长度, 最长长度, 预筛正则, strptime格式, Excel格式)
+_DATE_FORMATS = [
+    (*_strptime_length_range(fmt), _strptime_prefilter(fmt), fmt, excel_fmt)
+    for fmt, excel_fmt in (
+        ("%Y-%m-%d", "yyyy-mm-dd"),
+        ("%Y/%m/%d", "yyyy/mm/dd"),
+        ("%Y.%m.%d", "yyyy.mm.dd"),
+        ("%Y-%m-%d %H:%M:%S", "yyyy-mm-dd hh:mm:ss"),
+        ("%Y/%m/%d %H:%M:%S", "yyyy/mm/dd hh:mm:ss"),
+        ("%Y.%m.%d %H:%M:%S", "yyyy.mm.dd hh:mm:ss"),
+        ("%Y-%m-%d %H:%M", "yyyy-mm-dd hh:mm"),
+        ("%Y/%m/%d %H:%M", "yyyy/mm/dd hh:mm"),
+        ("%Y.%m.%d %H:%M", "yyyy.mm.dd hh:mm"),
+        # ("%Y%m%d", "yyyymmdd"),
+        # ("%Y%m", "yyyymm"),
+        ("%Y-%m", "yyyy-mm"),
+        ("%Y-%m-%dT%H:%M:%S", "yyyy-mm-ddThh:mm:ss"),
+        ("%Y-%m-%dT%H:%M:%S%z", "yyyy-mm-ddThh:mm:ss"),
+        ("%d/%m/%Y", "dd/mm/yyyy"),
+        ("%d-%m-%Y", "dd-mm-yyyy"),
+        ("%d.%m.%Y", "dd.mm.yyyy"),
+        ("%m/%d/%Y", "mm/dd/yyyy"),
+        ("%m-%d-%Y", "mm-dd-yyyy"),
+        ("%b %d, %Y", "mmm dd, yyyy"),
+        ("%B %d, %Y", "mmmm dd, yyyy"),
+        ("%d %b %Y", "dd mmm yyyy"),
+        ("%d %B %Y", "dd mmmm yyyy"),
+    )
+]
+
+
+# 日期字符串的形态：连续字母记为 A、连续空白记为一个空格、连续数字记为 D，其余字符保留
+_SHAPE_ALPHA_RE = re.compile(r"[^\W\d_]+")
+_SHAPE_SPACE_RE = re.compile(r"\s+")
+_SHAPE_DIGIT_RE = re.compile(r"\d+")
+
+# strptime 指令可能产生的形态片段，%d 允许前导空格，%z 为各种时区写法
+_SHAPE_FRAGMENTS = {
+    "Y": ("D",),
+    "m": ("D",),
+    "d": ("D", " D"),
+    "H": ("D",),
+    "M": ("D",),
+    "S": ("D",),
+    "b": ("A",),
+    "B": ("A",),
+    "z": tuple(
+        sign + tail
+        for sign in "+-"
+        for tail in ("D", "D:D", "D:D:D", "D:D:D.D", "D.D")
+    )
+    + ("A",),
+}
+
+
+def _date_shape(s):
+    """
+    计算字符串形态，如 "2024-01-02" -> "D-D-D"，"Oct 5, 2024" -> "A D, D"
+    """
+    return _SHAPE_DIGIT_RE.sub("D", _SHAPE_SPACE_RE.sub(" ", _SHAPE_ALPHA_RE.sub("A", s)))
+
+
+def _format_shapes(fmt):
+    """
+    枚举 strptime 格式能匹配的全部字符串形态
+    """
+    options = []
+    i = 0
+    while i < len(fmt):
+        if fmt[i] == "%":
+            options.append(_SHAPE_FRAGMENTS[fmt[i + 1]])
+            i += 2
+        else:
+            options.append((fmt[i],))
+            i += 1
+
+    shapes = set()
+    for combo in itertools.product(*options):
+        # 按运行时相同的规则归一化，合并相邻的同类片段
+        shapes.add(_date_shape("".join(combo).replace("D", "0").replace("A", "a")))
+    return shapes
+
+
+# 按形态归类的候选格式，组内保持原有优先顺序，运行时一次字典查找即可得到候选
+_FORMATS_BY_SHAPE = {}
+for _item in _DATE_FORMATS:
+    for _shape in _format_shapes(_item[3]):
+        _FORMATS_BY_SHAPE.setdefault(_shape, []).append(_item)
+del _item, _shape
+
+# 可直接交给 datetime.fromisoformat 校验的标准 ISO 日期形态
+_ISO_FAST_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}"
+    r"(?: \d{2}:\d{2}(?::\d{2})?|T\d{2}:\d{2}:\d{2}(?:Z|[+-]\d{2}:?\d{2})?)?\Z"
+)
+
+# 不可打印字符（ASCII 码 0-31 和 127）删除表，映射为 None 即删除
+_NON_PRINTABLE_TABLE = dict.fromkeys([*range(32), 127])
+# 同一组字符的字节形式，供 ASCII 字符串走 bytes.translate 快速路径
+_NON_PRINTABLE_BYTES = bytes([*range(32), 127])
+
+
+def excel_format_to_python(fmt: str) -> str:
+    """
+    将 Excel 自定义日期格式字符串转换为 Python 的 strftime 格式字符串
+    """
+    # 非 str 时才转成普通字符串，确保不会被格式化系统干扰；常见的 str 入参不做转换
+    return _excel_format_to_python(fmt if type(fmt) is str else str(fmt))
+
+
+@functools.lru_cache(maxsize=512)
+def _excel_format_to_python(fmt: str) -> str:
+    """
+    excel_format_to_python 的实际转换，同一列的格式高度重复，按格式缓存结果
+    """
+    # 单次从左到右匹配全部标记，替换结果不会被再次替换，无需清理多余的 %%
+    return _EXCEL_TOKEN_RE.sub(_excel_token_repl, fmt)
+
+
+def get_date_format(s: str) -> tuple[bool, str]:
+    """
+    判断字符串是否可以解析为日期。
+    自动兼容多种日期格式（中英文、数字、带时间等）。
+    返回:
+    - tuple[bool, str]: (是否匹配成功, Excel自定义格式字符串)
+    """
+
+    if not s or not isinstance(s, str):
+        return (False, "")
+
+    s = s.strip()
+    if not s:
+        return (False, "")
+
+    return _get_date_format(s)
 
-    @staticmethod
-    def excel_format_to_python(fmt: str) -> str:
-        """
-        将 Excel 自定义日期格式字符串转换为 Python 的 strftime 格式字符串
-        """
-        replacements = {
-            "yyyy": "%Y",
-            "yy": "%y",
-            "mmmm": "%B",
-            "mmm": "%b",
-            "mm": "%m",
-            "m": "%m",
-            "dddd": "%A",
-            "ddd": "%a",
-            "dd": "%d",
-            "d": "%d",
-            "hh": "%H",
-            "h": "%H",
-            "nn": "%M",  # Excel 中 n 表示分钟
-            "ss": "%S",
-        }
-
-        # 先转成普通字符串，确保不会被格式化系统干扰
-        result = str(fmt)
-
-        # 从长到短替换
-        for k in sorted(replacements.keys(), key=len, reverse=True):
-            result = result.replace(k, replacements[k])
-
-        # 最关键：去掉多余的 %%
-        result = result.replace("%%", "%")
-
-        return result
-
-    @staticmethod
-    def get_date_format(s: str) -> tuple[bool, str]:
-        """
-        判断字符串是否可以解析为日期。
-        自动兼容多种日期格式（中英文、数字、带时间等）。
-        返回:
-        - tuple[bool, str]: (是否匹配成功, Excel自定义格式字符串)
-        """
-
-        if not s or not isinstance(s, str):
-            return (False, "")
-
-        s = s.strip()
-        if not s:
-            return (False, "")
-
-        # ✅ 1. 快速过滤不可能的字符串
-        if not re.search(r"\d", s):
-            return (False, "")
-
-        # ✅ 2. 常见日期格式（按优先顺序尝试）
-        date_formats = [
-            ("%Y-%m-%d", "yyyy-mm-dd"),
-            ("%Y/%m/%d", "yyyy/mm/dd"),
-            ("%Y.%m.%d", "yyyy.mm.dd"),
-            ("%Y-%m-%d %H:%M:%S", "yyyy-mm-dd hh:mm:ss"),
-            ("%Y/%m/%d %H:%M:%S", "yyyy/mm/dd hh:mm:ss"),
-            ("%Y.%m.%d %H:%M:%S", "yyyy.mm.dd hh:mm:ss"),
-            ("%Y-%m-%d %H:%M", "yyyy-mm-dd hh:mm"),
-            ("%Y/%m/%d %H:%M", "yyyy/mm/dd hh:mm"),
-            ("%Y.%m.%d %H:%M", "yyyy.mm.dd hh:mm"),
-            # ("%Y%m%d", "yyyymmdd"),
-            # ("%Y%m", "yyyymm"),
-            ("%Y-%m", "yyyy-mm"),
-            ("%Y-%m-%dT%H:%M:%S", "yyyy-mm-ddThh:mm:ss"),
-            ("%Y-%m-%dT%H:%M:%S%z", "yyyy-mm-ddThh:mm:ss"),
-            ("%d/%m/%Y", "dd/mm/yyyy"),
-            ("%d-%m-%Y", "dd-mm-yyyy"),
-            ("%d.%m.%Y", "dd.mm.yyyy"),
-            ("%m/%d/%Y", "mm/dd/yyyy"),
-            ("%m-%d-%Y", "mm-dd-yyyy"),
-            ("%b %d, %Y", "mmm dd, yyyy"),
-            ("%B %d, %Y", "mmmm dd, yyyy"),
-            ("%d %b %Y", "dd mmm yyyy"),
-            ("%d %B %Y", "dd mmmm yyyy"),
-        ]
-
-        for fmt, excel_fmt in date_formats:
-            try:
-                datetime.strptime(s, fmt)
-                return (True, excel_fmt)
-            except ValueError:
-                continue
-
-        # ✅ 3. 处理中文日期（年/月/日/时/分/秒）
-        zh_pattern = re.compile(
-            r"^\s*(\d{2,4})年(\d{1,2})月(\d{1,2})日"
-            r"(\s*(\d{1,2})[时:：](\d{1,2})([分:：](\d{1,2})秒?)?)?\s*$"
-        )
-        if zh_pattern.match(s):
-            return (True, 'yyyy"年"mm"月"dd"日"')
-
-        # ✅ 4. 处理 ISO8601 格式（含Z或时区）
-        if re.match(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(Z|[+-]\d{2}:?\d{2})?$", s):
+
+@functools.lru_cache(maxsize=1024)
+def _get_date_format(s: str) -> tuple[bool, str]:
+    """
+    get_date_format 的实际判断，入参为去除首尾空白后的非空字符串，按字符串缓存结果
+    """
+    # ✅ 1. 快速过滤不可能的字符串
+    # 以数字开头时无需再搜索数字
+    if not s[0].isdecimal() and not _HAS_DIGIT_RE.search(s):
+        return (False, "")
+
+    # ✅ 2. 标准 ISO 形态用 C 实现的解析器（优先 ciso8601）校验，失败再走下面的通用流程
+    # 24 时交给通用流程，ciso8601 会把 24:00 视为次日零点，而 strptime 不接受
+    if _ISO_FAST_RE.match(s) and s[11:13] != "24":
+        try:
+            _parse_iso(s)
+        except ValueError:
+            pass
+        else:
+            n = len(s)
+            if n == 10:
+                return (True, "yyyy-mm-dd")
+            if s[10] == " ":
+                return (
+                    True,
+                    "yyyy-mm-dd hh:mm:ss" if n == 19 else "yyyy-mm-dd hh:mm",
+                )
             return (True, "yyyy-mm-ddThh:mm:ss")
 
-        # ✅ 5. 处理英文月份（如 "October 24th, 2025"）
-        s_clean = re.sub(r"(st|nd|rd|th)", "", s, flags=re.IGNORECASE)
+    # ✅ 3. 常见日期格式（按优先顺序尝试），先用正则预筛，命中后再用 strptime 校验
+    # 按字符串形态查出可能匹配的格式，通常只有一两个
+    candidates = _FORMATS_BY_SHAPE.get(_date_shape(s), ())
+    n = len(s)
+    for min_len, max_len, pattern, fmt, excel_fmt in candidates:
+        # 长度不在格式可匹配范围内的直接跳过，再用正则预筛
+        if not min_len <= n <= max_len or not pattern.match(s):
+            continue
         try:
-            datetime.strptime(s_clean, "%B %d, %Y")
-            return (True, "mmmm dd, yyyy")
+            datetime.strptime(s, fmt)
+            return (True, excel_fmt)
         except ValueError:
-            try:
-                datetime.strptime(s_clean, "%b %d, %Y")
-                return (True, "mmm dd, yyyy")
-            except ValueError:
-                pass
+            continue
+
+    # ✅ 4. 处理中文日期（年/月/日/时/分/秒）
+    if _ZH_DATE_RE.match(s):
+        return (True, 'yyyy"年"mm"月"dd"日"')
+
+    # ✅ 5. 处理 ISO8601 格式（含Z或时区）
+    if _ISO_RE.match(s):
+        return (True, "yyyy-mm-ddThh:mm:ss")
 
+    # ✅ 6. 处理英文月份（如 "October 24th, 2025"）
+    s_clean, n = _ORDINAL_RE.subn(r"\1", s)
+    # 没有序数词时与第 3 步尝试过的格式相同，无需重复解析
+    if n == 0:
         return (False, "")
+    try:
+        datetime.strptime(s_clean, "%B %d, %Y")
+        return (True, "mmmm dd, yyyy")
+    except ValueError:
+        try:
+            datetime.strptime(s_clean, "%b %d, %Y")
+            return (True, "mmm dd, yyyy")
+        except ValueError:
+            pass
 
-    @staticmethod
-    def hex_to_bgr(color: str) -> int:
-        """
-        将十六进制颜色转换为 BGR 整数，莫名其妙要这个格式，而不是rgb格式。
-
-        参数:
-        - color: str, 颜色值，支持十六进制或常用颜色名
-
-        返回:
-        - int, BGR 整数
-        """
-        # 统一小写
-        color = color.lower().strip()
-
-        # 解析十六进制颜色
-        if color.startswith("#") and len(color) == 7:
-            r = int(color[1:3], 16)
-            g = int(color[3:5], 16)
-            b = int(color[5:7], 16)
-            bgr_value = (b << 16) | (g << 8) | r
-            return bgr_value
-        else:
-            logger.warning(f"不支持的颜色格式: {color}")
-            raise ValueError(f"不支持的颜色格式: {color}")
-
-    @staticmethod
-    def normalize_row_lengths(arr: List[List[Any]], fill: Any = "") -> List[List[Any]]:
-        """
-        将二维数组每一行长度补齐，使用指定填充值（默认 ""）。
-
-        参数：
-            arr: List[List[Any]]，二维数组
-            fill: Any，可选，补充的默认值
-
-        返回:
-            List[List[Any]]，每行长度一致的二维数组
-        """
-        if not arr:
-            return []
-
-        max_len = max(len(row) for row in arr)
-        return [row + [fill] * (max_len - len(row)) for row in arr]
-
-    @staticmethod
-    def remove_non_printable(s: str) -> str:
-        """
-        移除字符串中的不可打印字符（ASCII 码 0-31 和 127）。
-
-        参数:
-        - s: str, 输入字符串
-
-        返回:
-        - str, 移除不可打印字符后的字符串
-        """
-        if not s:
-            return ""
-        return re.sub(r"[\x00-\x1F\x7F]", "", s)
+    return (False, "")
+
+
+def hex_to_bgr(color: str) -> int:
+    """
+    将十六进制颜色转换为 BGR 整数，莫名其妙要这个格式，而不是rgb格式。
+
+    参数:
+    - color: str, 颜色值，支持十六进制或常用颜色名
+
+    返回:
+    - int, BGR 整数
+    """
+    # 统一小写
+    color = color.lower().strip()
+
+    # 解析十六进制颜色
+    if color.startswith("#") and len(color) == 7:
+        return hex_to_bgr_bytes(color)
+    else:
+        logger.warning(f"不支持的颜色格式: {color}")
+        raise ValueError(f"不支持的颜色格式: {color}")
+
+
+def hex_to_bgr_bytes(color: bytes) -> int:
+    """
+    hex_to_bgr 的快速版本，要求传入规范的 "#RRGGBB"，不做大小写和空白处理。
+    也接受只含 ASCII 字符的 str。
+
+    参数:
+    - color: bytes, 形如 b"#ff0000" 的颜色值
+
+    返回:
+    - int, BGR 整数
+    """
+    # unhexlify 在 C 层把 RRGGBB 解析为 [R, G, B] 三个字节，
+    # 按小端序组成整数即 R 在低位、B 在高位，正好是 BGR
+    return int.from_bytes(binascii.unhexlify(color[1:7]), "little")
+
+
+def normalize_row_lengths(arr: List[List[Any]], fill: Any = "") -> List[List[Any]]:
+    """
+    将二维数组每一行长度补齐，使用指定填充值（默认 ""）。
+
+    参数：
+        arr: List[List[Any]]，二维数组
+        fill: Any，可选，补充的默认值
+
+    返回:
+        List[List[Any]]，每行长度一致的二维数组
+    """
+    if not arr:
+        return []
+
+    max_len = max(map(len, arr))
+    # 每行都生成新列表，修改结果不会影响输入；无需复制时使用 normalize_row_lengths_inplace
+    return [row + [fill] * (max_len - len(row)) for row in arr]
+
+
+def normalize_row_lengths_inplace(
+    arr: List[List[Any]], fill: Any = ""
+) -> List[List[Any]]:
+    """
+    原地将二维数组每一行长度补齐，不创建新的行列表。
+
+    参数：
+        arr: List[List[Any]]，二维数组，每行需为可修改的 list
+        fill: Any，可选，补充的默认值
+
+    返回:
+        List[List[Any]]，传入的 arr 本身
+    """
+    if not arr:
+        return arr
+
+    max_len = max(map(len, arr))
+    for row in arr:
+        if len(row) < max_len:
+            row.extend([fill] * (max_len - len(row)))
+    return arr
+
+
+def remove_non_printable(s: str) -> str:
+    """
+    移除字符串中的不可打印字符（ASCII 码 0-31 和 127）。
+
+    参数:
+    - s: str, 输入字符串
+
+    返回:
+    - str, 移除不可打印字符后的字符串
+    """
+    if not s:
+        return ""
+    # 绝大多数字符串不含控制字符，isprintable 一次 C 级扫描即可原样返回，不分配新字符串
+    if s.isprintable():
+        return s
+    # 纯 ASCII 字符串用 bytes.translate 删除，比 str.translate 查表更快；
+    # 用 isascii 判断而不是捕获编码异常，中文文本不会每次抛异常
+    if s.isascii():
+        return s.encode("ascii").translate(None, _NON_PRINTABLE_BYTES).decode("ascii")
+    return s.translate(_NON_PRINTABLE_TABLE)
+
+
+class OfficeUtils:
+    """
+    兼容旧用法的静态方法集合，实际实现为模块级函数，
+    热点调用处可直接导入模块级函数，省去类属性查找
+    """
+
+    excel_format_to_python = staticmethod(excel_format_to_python)
+    get_date_format = staticmethod(get_date_format)
+    hex_to_bgr = staticmethod(hex_to_bgr)
+    hex_to_bgr_bytes = staticmethod(hex_to_bgr_bytes)
+    normalize_row_lengths = staticmethod(normalize_row_lengths)
+    normalize_row_lengths_inplace = staticmethod(normalize_row_lengths_inplace)
+    remove_non_printable = staticmethod(remove_non_printable)